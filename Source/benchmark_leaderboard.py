@@ -0,0 +1,104 @@
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import add_match_info, load_events, load_matches
+from leaderboard import Leaderboard
+from ratings import calculate_player_ratings
+from scoring import score_shot_attempts
+
+
+def scaled_shots(shot_data, scale):
+    """The shots repeated `scale` times, each copy under renamed players (simulates more leagues)"""
+    copies = [shot_data.assign(player=shot_data['player'].astype(object))]
+    for copy in range(2, scale + 1):
+        copies.append(shot_data.assign(player=shot_data['player'].astype(object) + f' {copy}'))
+    return pd.concat(copies, ignore_index=True)
+
+
+def sample_filters(leaderboard, count, seed=0):
+    """Random combinations of team, opponent, league, min_shots and rating band"""
+    rng = random.Random(seed)
+    teams, leagues = leaderboard.keys('team'), leaderboard.keys('league')
+    queries = []
+    for _ in range(count):
+        filters = {}
+        if rng.random() < 0.4:
+            filters['team'] = rng.choice(teams)
+        if rng.random() < 0.3:
+            filters['opponent'] = rng.choice(teams)
+        if rng.random() < 0.3 and leagues:
+            filters['league'] = rng.choice(leagues)
+        if rng.random() < 0.5:
+            filters['min_shots'] = rng.choice([5, 10, 20])
+        if rng.random() < 0.3:
+            low = rng.uniform(20, 70)
+            filters['rating_band'] = (low, low + 10)
+        queries.append(filters)
+    return queries
+
+
+def scan_top(ratings, key_ranks, n, team=None, opponent=None, league=None, min_shots=None, rating_band=None):
+    """
+    Baseline: a boolean mask over every player (team/opponent/league membership
+    from the same per-key player lists), then the first n rows of the
+    rating-ordered table
+    """
+    matches = np.ones(len(ratings), dtype=bool)
+    for name, key in (('team', team), ('opponent', opponent), ('league', league)):
+        if key is not None:
+            members = np.zeros(len(ratings), dtype=bool)
+            members[key_ranks[name].get(key, [])] = True
+            matches &= members
+    if min_shots is not None:
+        matches &= ratings['Total_Shots'].to_numpy() >= min_shots
+    if rating_band is not None:
+        rating = ratings['Overall_Shooting_Rating'].to_numpy()
+        matches &= (rating >= rating_band[0]) & (rating <= rating_band[1])
+    return np.flatnonzero(matches)[:n]
+
+
+def percentiles(times):
+    microseconds = np.array(times) * 1e6
+    return np.percentile(microseconds, 50), np.percentile(microseconds, 99)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Top-N latency: full scan vs Leaderboard indexes')
+    parser.add_argument('--events', help='path to events.csv (default: $EVENTS_CSV)')
+    parser.add_argument('--matches', help='path to ginf.csv (default: $GINF_CSV)')
+    parser.add_argument('--scale', type=int, default=1, help='repeat the players this many times')
+    parser.add_argument('--queries', type=int, default=300, help='number of queries to time')
+    parser.add_argument('--top', type=int, default=20, help='N of each top-N query')
+    args = parser.parse_args()
+
+    shot_data = scaled_shots(add_match_info(score_shot_attempts(load_events(args.events)),
+                                            load_matches(args.matches)), args.scale)
+    ratings = calculate_player_ratings(shot_data).reset_index(drop=True)
+
+    start = time.perf_counter()
+    leaderboard = Leaderboard(ratings, shot_data)
+    build_time = time.perf_counter() - start
+
+    queries = sample_filters(leaderboard, args.queries)
+    scan_times, index_times, differing = [], [], 0
+    for filters in queries:
+        start = time.perf_counter()
+        expected = scan_top(ratings, leaderboard.key_ranks, args.top, **filters)
+        scan_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ranks = leaderboard.top(args.top, **filters)
+        index_times.append(time.perf_counter() - start)
+        differing += not np.array_equal(ranks, expected)
+
+    print(f"Players: {len(ratings)}, shots: {len(shot_data)}, queries: {len(queries)} (top {args.top})")
+    print(f"Leaderboard built in {build_time:.2f} s")
+    print(f"\n{'µs per query':14} {'p50':>10} {'p99':>10}")
+    for name, times in (('full scan', scan_times), ('leaderboard', index_times)):
+        p50, p99 = percentiles(times)
+        print(f"{name:14} {p50:10.0f} {p99:10.0f}")
+    print(f"\nQueries whose results (including tie order) differ from the full scan: {differing}")
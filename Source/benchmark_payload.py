@@ -0,0 +1,81 @@
+import argparse
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import pandas as pd
+
+from data_loader import add_match_info, load_events, load_matches
+from scoring import score_shot_attempts
+from web_payload import DECODE_BLOCK_JS, compact_json, encode_shot_block, page_shots
+
+# Parses each payload file the way the page does and prints the best time of 5 runs in ms
+NODE_PARSE_JS = DECODE_BLOCK_JS + '''
+const fs = require('fs');
+const atob = globalThis.atob || (text => Buffer.from(text, 'base64').toString('latin1'));
+for (const [name, path, columnar] of JSON.parse(process.argv[1])) {
+    const text = fs.readFileSync(path, 'utf8');
+    let best = Infinity;
+    for (let run = 0; run < 5; run++) {
+        const start = process.hrtime.bigint();
+        const parsed = JSON.parse(text);
+        if (columnar) decodeShotBlock(parsed);
+        best = Math.min(best, Number(process.hrtime.bigint() - start) / 1e6);
+    }
+    console.log(`${name}\\t${best}`);
+}
+'''
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Records JSON vs columnar shot payload for the web page')
+    parser.add_argument('--events', help='path to events.csv (default: $EVENTS_CSV)')
+    parser.add_argument('--matches', help='path to ginf.csv (default: $GINF_CSV)')
+    parser.add_argument('--ratings', default='player_shooting_ratings.csv', help='player ratings CSV')
+    args = parser.parse_args()
+
+    shot_data = score_shot_attempts(load_events(args.events))
+    rated_players = list(pd.read_csv(args.ratings)['Player'])
+    rated_shots = page_shots(add_match_info(shot_data, load_matches(args.matches)), rated_players)
+
+    # The previous inline format: every shot as an indented dict of all its columns
+    records, records_time = timed(lambda: json.dumps(shot_data.astype(object).fillna('').to_dict('records'), indent=2))
+    columnar, columnar_time = timed(lambda: compact_json(encode_shot_block(rated_shots, rated_players)))
+
+    payloads = {'records (indent=2)': (records, records_time, False),
+                'columnar': (columnar, columnar_time, True)}
+    print(f"Shots: {len(shot_data)} ({len(rated_shots)} by rated players)")
+    print(f"\n{'payload':20} {'MB':>8} {'gzip MB':>8} {'encode s':>9} {'parse ms':>9}")
+
+    parse_ms = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for name, (text, _, is_columnar) in payloads.items():
+            path = os.path.join(tmp, f'{len(files)}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            files.append([name, path, is_columnar])
+
+        # Browser-side parse time is measured with node when it is installed
+        if shutil.which('node'):
+            output = subprocess.run(['node', '-e', NODE_PARSE_JS, json.dumps(files)],
+                                    capture_output=True, text=True, check=True).stdout
+            parse_ms = {name: float(ms) for name, ms in (line.split('\t') for line in output.splitlines())}
+
+    for name, (text, encode_time, _) in payloads.items():
+        data = text.encode('utf-8')
+        parse = f"{parse_ms[name]:9.1f}" if name in parse_ms else f"{'n/a':>9}"
+        print(f"{name:20} {len(data) / 1e6:8.2f} {len(gzip.compress(data)) / 1e6:8.2f} "
+              f"{encode_time:9.2f} {parse}")
+    if not parse_ms:
+        print("\nInstall node to measure parse time")
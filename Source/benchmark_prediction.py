@@ -0,0 +1,75 @@
+import argparse
+import time
+
+import numpy as np
+
+from data_loader import load_events
+from model import compile_forest, feature_matrix, iter_predict, predict_batch, train_shooting_model
+from scoring import score_shot_attempts
+
+
+def per_call_latency(predict, rows, repeats):
+    """Average seconds per single-shot predict call"""
+    start = time.perf_counter()
+    for i in range(repeats):
+        predict(rows[i % len(rows)].reshape(1, -1))
+    return (time.perf_counter() - start) / repeats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Random Forest vs compiled lookup-table predictor')
+    parser.add_argument('--events', help='path to events.csv (default: $EVENTS_CSV)')
+    parser.add_argument('--single-calls', type=int, default=200, help='single-shot calls to time')
+    args = parser.parse_args()
+
+    shot_data = score_shot_attempts(load_events(args.events))
+    X = feature_matrix(shot_data)
+    rf_model = train_shooting_model(X, shot_data['shooting_ability_score'].to_numpy())
+    # Reference predictions come from a single-threaded predict, which adds trees in a fixed order
+    rf_model.set_params(n_jobs=1)
+
+    start = time.perf_counter()
+    compiled_model = compile_forest(rf_model, observed=X)
+    compile_time = time.perf_counter() - start
+
+    # Exactness over every observed shot, in one batch and as single calls
+    start = time.perf_counter()
+    forest_batch = rf_model.predict(X)
+    forest_batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled_batch = compiled_model.predict(X)
+    compiled_batch_time = time.perf_counter() - start
+
+    observed = np.unique(X, axis=0)
+    exact_observed = np.array_equal(forest_batch, compiled_batch)
+    exact_single = all(rf_model.predict(row.reshape(1, -1))[0] == compiled_model.predict(row)[0]
+                       for row in observed[::max(1, len(observed) // 200)])
+
+    forest_single = per_call_latency(rf_model.predict, observed, args.single_calls)
+    compiled_single = per_call_latency(compiled_model.predict, observed, args.single_calls * 50)
+
+    print(f"Shots: {len(X)}, distinct feature tuples observed: {len(observed)}, "
+          f"table size: {len(compiled_model.table)} + {len(compiled_model.extra)} observed outside the grid")
+    print(f"Compile time (forest over grid and observed tuples): {compile_time:.2f} s")
+    print(f"\n{'':22} {'forest':>14} {'lookup table':>14} {'speedup':>9}")
+    print(f"{'single call (µs/shot)':22} {forest_single * 1e6:14.1f} {compiled_single * 1e6:14.1f} "
+          f"{forest_single / compiled_single:8.0f}x")
+    print(f"{'batch (µs/shot)':22} {forest_batch_time / len(X) * 1e6:14.3f} "
+          f"{compiled_batch_time / len(X) * 1e6:14.3f} {forest_batch_time / compiled_batch_time:8.0f}x")
+    # Batch API throughput from each supported input type
+    shots_df = shot_data[compiled_model.features]
+    records = shots_df.astype(object).where(shots_df.notna(), None).to_dict('records')
+    structured = np.rec.fromarrays(X.T, names=compiled_model.features)
+    print(f"\n{'predict_batch input':22} {'µs/shot':>14} {'shots/s':>14}")
+    for name, predict in [('DataFrame', lambda: predict_batch(compiled_model, shots_df)),
+                          ('structured array', lambda: predict_batch(compiled_model, structured)),
+                          ('list of dicts', lambda: predict_batch(compiled_model, records)),
+                          ('micro-batches of 1024', lambda: list(iter_predict(compiled_model, records)))]:
+        start = time.perf_counter()
+        predict()
+        per_shot = (time.perf_counter() - start) / len(X)
+        print(f"{name:22} {per_shot * 1e6:14.3f} {1 / per_shot:14,.0f}")
+
+    print(f"\nExact match on all shots: {exact_observed}")
+    print(f"Exact match on single calls: {exact_single}")
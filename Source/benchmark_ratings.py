@@ -0,0 +1,58 @@
+import sys
+import time
+
+import pandas as pd
+
+from data_loader import load_events
+from ratings import calculate_overall_player_rating, calculate_player_ratings
+from scoring import score_shot_attempts
+
+
+def player_ratings_loop(shot_data):
+    """Original per-player boolean-mask loop (one full scan of shot_data per player)"""
+    player_overall_ratings = []
+
+    for player in shot_data['player'].unique():
+        if pd.isna(player):  # Skip NaN players
+            continue
+
+        player_shots = shot_data[shot_data['player'] == player]
+
+        if len(player_shots) >= 3:  # Minimum 3 shots for rating
+            overall_rating = calculate_overall_player_rating(player_shots)
+
+            player_overall_ratings.append({
+                'Player': player,
+                'Overall_Shooting_Rating': round(overall_rating, 1),
+                'Total_Shots': len(player_shots),
+                'Goals': player_shots['is_goal'].sum(),
+                'Goal_Rate_%': round(player_shots['is_goal'].mean() * 100, 1),
+                'Avg_Shot_Quality': round(player_shots['shooting_ability_score'].mean(), 1),
+                'Shot_Consistency': round(player_shots['shooting_ability_score'].std(), 1),
+                'Best_Shot': round(player_shots['shooting_ability_score'].max(), 1),
+                'Worst_Shot': round(player_shots['shooting_ability_score'].min(), 1)
+            })
+
+    overall_ratings_df = pd.DataFrame(player_overall_ratings)
+    return overall_ratings_df.sort_values('Overall_Shooting_Rating', ascending=False)
+
+
+# Usage: python benchmark_ratings.py [path/to/events.csv]
+shot_data = score_shot_attempts(load_events(sys.argv[1] if len(sys.argv) > 1 else None))
+
+start = time.perf_counter()
+loop_df = player_ratings_loop(shot_data)
+loop_time = time.perf_counter() - start
+
+start = time.perf_counter()
+grouped_df = calculate_player_ratings(shot_data)
+grouped_time = time.perf_counter() - start
+
+# Compare the CSV text each path would write
+identical = loop_df.to_csv(index=False) == grouped_df.to_csv(index=False)
+
+print(f"Players rated:        {len(grouped_df)} ({shot_data['player'].nunique()} with shots)")
+print(f"Per-player loop:      {loop_time:.3f} s")
+print(f"Grouped aggregation:  {grouped_time:.3f} s")
+print(f"Speedup:              {loop_time / grouped_time:.1f}x")
+print(f"Identical CSV output: {identical}")
@@ -0,0 +1,35 @@
+import sys
+import time
+
+import numpy as np
+
+from data_loader import load_events
+from scoring import create_shooting_ability_target, score_shot_attempts
+
+# Usage: python benchmark_scoring.py [path/to/events.csv]  (default: $EVENTS_CSV)
+df = load_events(sys.argv[1] if len(sys.argv) > 1 else None)
+
+# Original path: one Python call per event, then filter shot attempts
+start = time.perf_counter()
+scored = df.copy()
+scored['shooting_ability_score'] = scored.apply(create_shooting_ability_target, axis=1)
+apply_shots = scored[scored['event_type'] == 1].copy()
+apply_shots = apply_shots.dropna(subset=['shooting_ability_score'])
+apply_time = time.perf_counter() - start
+
+# Vectorized path: filter shot attempts first, then dense lookup tables
+start = time.perf_counter()
+vector_shots = score_shot_attempts(df)
+vector_time = time.perf_counter() - start
+
+identical = (
+    apply_shots.index.equals(vector_shots.index)
+    and np.array_equal(apply_shots['shooting_ability_score'].to_numpy(),
+                       vector_shots['shooting_ability_score'].to_numpy())
+)
+
+print(f"Shot attempts scored: {len(vector_shots)}")
+print(f"df.apply (row-wise):  {apply_time:.3f} s")
+print(f"Lookup tables:        {vector_time:.3f} s")
+print(f"Speedup:              {apply_time / vector_time:.1f}x")
+print(f"Identical scores:     {identical}")
@@ -0,0 +1,100 @@
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from web_payload import DECODE_BLOCK_JS, SEARCH_JS, build_search_index, compact_json
+
+# Times every query with the old linear scan and with the search index, then prints
+# one JSON line with latency percentiles and the number of differing result lists
+NODE_BENCHMARK_JS = DECODE_BLOCK_JS + '\n' + SEARCH_JS + r'''
+const atob = globalThis.atob || (text => Buffer.from(text, 'base64').toString('latin1'));
+const {names, index, queries} = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const playersData = names.map(name => ({Player: name}));
+
+function linearSearch(query, limit) {
+    const text = query.toLowerCase().trim();
+    if (text.length < 2) return [];
+    const matches = [];
+    playersData.forEach((player, position) => {
+        if (player.Player.toLowerCase().includes(text)) matches.push(position);
+    });
+    return matches.slice(0, limit);
+}
+
+function time(search) {
+    const times = [], results = [];
+    for (const query of queries) {
+        const start = process.hrtime.bigint();
+        results.push(search(query, 10));
+        times.push(Number(process.hrtime.bigint() - start) / 1e3);
+    }
+    times.sort((a, b) => a - b);
+    const at = share => times[Math.min(times.length - 1, Math.floor(share * times.length))];
+    return {results, p50: at(0.5), p99: at(0.99), max: times[times.length - 1]};
+}
+
+const search = createPlayerSearch(index);
+time(search);  // warm up (decodes the posting lists once)
+const linear = time(linearSearch), indexed = time(search);
+// Plain-text queries must give exactly the old results whenever the old scan found any
+const differing = queries.filter((query, i) => linear.results[i].length &&
+    linear.results[i].join() !== indexed.results[i].join()).length;
+console.log(JSON.stringify({linear, indexed, differing}, (key, value) => key === 'results' ? undefined : value));
+'''
+
+
+def sample_queries(names, count, seed=0):
+    """Prefixes and inner substrings (2-8 characters) of random names, plus random misses"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        length = rng.randint(2, 8)
+        kind = rng.random()
+        if kind < 0.5:
+            queries.append(name[:length])
+        elif kind < 0.9:
+            start = rng.randint(0, max(0, len(name) - length))
+            queries.append(name[start:start + length])
+        else:
+            queries.append(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(length)))
+    return queries
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Autocomplete latency: linear scan vs search index')
+    parser.add_argument('--ratings', default='player_shooting_ratings.csv', help='player ratings CSV')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='repeat the player list this many times (with numbered copies) to '
+                             'simulate more leagues')
+    parser.add_argument('--queries', type=int, default=2000, help='number of queries to time')
+    args = parser.parse_args()
+
+    if not shutil.which('node'):
+        sys.exit("node is required to time the page's search code")
+
+    names = list(pd.read_csv(args.ratings)['Player'])
+    names = names + [f'{name} {copy}' for copy in range(2, args.scale + 1) for name in names]
+
+    start = time.perf_counter()
+    index = build_search_index(names)
+    build_time = time.perf_counter() - start
+    index_bytes = len(compact_json(index).encode('utf-8'))
+
+    payload = json.dumps({'names': names, 'index': index, 'queries': sample_queries(names, args.queries)})
+    output = subprocess.run(['node', '-e', NODE_BENCHMARK_JS], input=payload,
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output)
+
+    print(f"Players: {len(names)}, queries: {args.queries}")
+    print(f"Search index: {len(index['grams'])} n-grams, {index_bytes / 1024:.0f} KB, built in {build_time:.2f} s")
+    print(f"\n{'µs per query':14} {'p50':>8} {'p99':>8} {'max':>8}")
+    for name in ('linear', 'indexed'):
+        print(f"{name:14} {result[name]['p50']:8.1f} {result[name]['p99']:8.1f} {result[name]['max']:8.1f}")
+    print(f"\nQueries whose results differ from the linear scan: {result['differing']}")
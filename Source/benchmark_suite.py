@@ -0,0 +1,182 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from data_loader import add_match_info, load_matches, read_events_csv
+from instrumentation import REGRESSION_RATIO, RunMetrics, compare
+from model import compile_forest, feature_matrix, predict_batch, train_shooting_model
+from ratings import calculate_player_ratings
+from scoring import score_shot_attempts
+from synthetic_data import EVENTS_PER_SCALE, dataset_paths, write_dataset
+
+DEFAULT_SCALES = [0.1, 1]
+DEFAULT_DATA_DIR = 'synthetic_data'
+DEFAULT_BASELINE_PATH = 'benchmark_baseline.json'
+# The forest is fitted on at most this many shots (a sample) so training time
+# stays comparable across scales; prediction still scores every shot
+DEFAULT_TRAIN_ROWS = 250_000
+WEBSITE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'create_embedded_website.py')
+
+
+def dataset(scale, data_dir, seed=0):
+    """The events.csv / ginf.csv pair for a scale, generated on first use (same seed, same files)"""
+    events_path, matches_path = dataset_paths(data_dir, scale)
+    if not (os.path.exists(events_path) and os.path.exists(matches_path)):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"Generating {scale:g}x ({round(scale * EVENTS_PER_SCALE):,} events) in '{data_dir}'...")
+        write_dataset(events_path, matches_path, round(scale * EVENTS_PER_SCALE), seed)
+    return events_path, matches_path
+
+
+def frame_digest(frame):
+    """SHA-256 of a table's CSV text, to check that results did not change"""
+    return hashlib.sha256(frame.to_csv(index=False).encode('utf-8')).hexdigest()
+
+
+def run_website(events_path, matches_path, ratings):
+    """
+    Run create_embedded_website.py in a scratch directory on these events and
+    ratings; returns the stage metrics it recorded and the page size
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        ratings.to_csv(os.path.join(work_dir, 'player_shooting_ratings.csv'), index=False)
+        metrics_path = os.path.join(work_dir, 'website.json')
+        env = dict(os.environ, EVENTS_CSV=os.path.abspath(events_path),
+                   GINF_CSV=os.path.abspath(matches_path), RUN_METRICS=metrics_path)
+        subprocess.run([sys.executable, WEBSITE_SCRIPT], cwd=work_dir, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        with open(metrics_path, encoding='utf-8') as f:
+            website = json.load(f)
+        page_bytes = os.path.getsize(os.path.join(work_dir, 'player_analysis_embedded.html'))
+    return website['stages'], page_bytes
+
+
+def run_scale(scale, events_path, matches_path, train_rows, website=True):
+    """
+    Time every stage on one dataset (called in a fresh process per scale, so
+    peak memory is that scale's own). Returns the stage records and a
+    fingerprint of the results.
+    """
+    metrics = RunMetrics(f'benchmark_suite {scale:g}x')
+    with metrics.stage('csv_read') as stage:
+        events = read_events_csv(events_path)
+        matches = load_matches(matches_path)
+        stage['rows'] = len(events)
+
+    with metrics.stage('scoring', rows=len(events)):
+        shot_data = add_match_info(score_shot_attempts(events), matches)
+
+    with metrics.stage('aggregation', rows=len(shot_data)):
+        ratings = calculate_player_ratings(shot_data)
+
+    with metrics.stage('training') as stage:
+        train = shot_data.sample(n=min(train_rows, len(shot_data)), random_state=42)
+        rf_model = train_shooting_model(feature_matrix(train), train['shooting_ability_score'].to_numpy())
+        stage['rows'] = len(train)
+
+    with metrics.stage('prediction', rows=len(shot_data)):
+        X = feature_matrix(shot_data)
+        predictions = predict_batch(compile_forest(rf_model, observed=X), X)
+
+    y = shot_data['shooting_ability_score'].to_numpy()
+    results = {
+        'events': len(events),
+        'shots': len(shot_data),
+        'rated_players': len(ratings),
+        'mean_score': round(float(y.mean()), 6),
+        'ratings_sha256': frame_digest(ratings),
+        'prediction_rmse': round(float(np.sqrt(np.mean((predictions - y) ** 2))), 4)
+    }
+
+    if website:
+        with metrics.stage('website', rows=len(shot_data)) as stage:
+            stage['stages'], results['page_bytes'] = run_website(events_path, matches_path, ratings)
+
+    return {'scale': scale, **metrics.summary(), 'results': results}
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def report(run, baseline_run, threshold):
+    """Print one scale's stages (against the baseline, if any); returns (regressed stages, changed results)"""
+    print(f"\n=== {run['scale']:g}x: {run['results']['events']:,} events, {run['results']['shots']:,} shots, "
+          f"{run['results']['rated_players']:,} rated players, peak {run['peak_memory_mb'] or 0:.0f} MB ===")
+    ratios = {}
+    if baseline_run is not None:
+        ratios = {stage: (ratio, regressed) for stage, _, _, ratio, regressed in compare(baseline_run, run, threshold)}
+
+    regressions = 0
+    print(f"{'Stage':12} {'Wall s':>8} {'CPU s':>8} {'Peak MB':>8} {'Rows/s':>12} {'vs base':>8}")
+    for record in run['stages']:
+        ratio, regressed = ratios.get(record['stage'], (None, False))
+        regressions += regressed
+        print(f"{record['stage']:12} {record['wall_seconds']:8.2f} {record['cpu_seconds']:8.2f} "
+              f"{record.get('peak_memory_mb') or 0:8.0f} {record.get('rows_per_second') or 0:12,} "
+              f"{f'{ratio:.2f}' if ratio is not None else '-':>8}" + ("  ⚠️ slower" if regressed else ''))
+
+    changed = []
+    if baseline_run is not None:
+        expected = baseline_run['results']
+        changed = [key for key, value in run['results'].items() if key in expected and expected[key] != value]
+        for key in changed:
+            print(f"❌ {key} changed: {expected[key]} -> {run['results'][key]}")
+    return regressions, changed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time scoring, aggregation, training, prediction and page generation on synthetic data')
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES,
+                        help=f'dataset sizes in multiples of the Kaggle events.csv ({EVENTS_PER_SCALE:,} events; '
+                             f'e.g. 0.1 1 10)')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='where the synthetic CSVs are kept')
+    parser.add_argument('--train-rows', type=int, default=DEFAULT_TRAIN_ROWS,
+                        help='fit the forest on a sample of at most this many shots')
+    parser.add_argument('--skip-website', action='store_true', help='do not time create_embedded_website.py')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help='stored baseline to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_RATIO,
+                        help='flag stages whose time per row grew by at least this ratio')
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    if baseline is not None:
+        print(f"Comparing with the baseline in '{args.baseline}' ({baseline['created']})")
+
+    runs, regressions, changed = {}, 0, 0
+    for scale in args.scales:
+        events_path, matches_path = dataset(scale, args.data_dir)
+        # One fresh process per scale, so each peak memory figure is that scale's own
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            run = pool.submit(run_scale, scale, events_path, matches_path,
+                              args.train_rows, not args.skip_website).result()
+        runs[f'{scale:g}'] = run
+        baseline_run = baseline['scales'].get(f'{scale:g}') if baseline is not None else None
+        scale_regressions, scale_changed = report(run, baseline_run, args.threshold)
+        regressions += scale_regressions
+        changed += len(scale_changed)
+
+    if baseline is not None:
+        print(f"\n{regressions} stage(s) slower by {args.threshold:.2f}x or more, {changed} result(s) changed")
+    if args.save_baseline:
+        # Scales not run this time keep their previous baseline
+        scales = {**(baseline['scales'] if baseline is not None else {}), **runs}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+                       'train_rows': args.train_rows, 'scales': scales}, f, indent=2)
+        print(f"✅ Baseline saved to '{args.baseline}'")
@@ -0,0 +1,43 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from data_loader import load_events, peak_memory_mb
+from model import feature_matrix, train_shooting_model
+from scoring import FEATURES, score_shot_attempts
+
+
+def timed_fit(X, y, n_jobs, n_estimators):
+    """Fit one forest in a fresh process and report fit time and that process's peak memory"""
+    start_memory = peak_memory_mb()
+    start = time.perf_counter()
+    train_shooting_model(X, y, n_jobs=n_jobs, n_estimators=n_estimators)
+    return time.perf_counter() - start, start_memory, peak_memory_mb()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Random Forest fit time and peak memory by workers and trees')
+    parser.add_argument('--events', help='path to events.csv (default: $EVENTS_CSV)')
+    parser.add_argument('--jobs', type=int, nargs='+', default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--trees', type=int, nargs='+', default=[25, 50, 100])
+    args = parser.parse_args()
+
+    shot_data = score_shot_attempts(load_events(args.events))
+    X = feature_matrix(shot_data)
+    y = shot_data['shooting_ability_score'].to_numpy()
+
+    frame_mb = shot_data[FEATURES].memory_usage(deep=True).sum() / 1024 ** 2
+    print(f"Training on all {len(X)} shots: feature matrix {X.nbytes / 1024 ** 2:.1f} MB "
+          f"({X.dtype}, C-contiguous={X.flags['C_CONTIGUOUS']}) vs {frame_mb:.1f} MB DataFrame slice")
+    print(f"\n{'jobs':>5} {'trees':>6} {'fit (s)':>9} {'peak RSS (MB)':>14} {'fit delta (MB)':>15}")
+
+    # Each configuration runs in its own process so peak memory is not carried over
+    for n_jobs in args.jobs:
+        for n_estimators in args.trees:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                fit_time, before, peak = pool.submit(timed_fit, X, y, n_jobs, n_estimators).result()
+            peak_text = f"{peak:14.0f}" if peak is not None else f"{'n/a':>14}"
+            delta_text = f"{peak - before:15.0f}" if peak is not None else f"{'n/a':>15}"
+            print(f"{n_jobs:>5} {n_estimators:>6} {fit_time:9.2f} {peak_text} {delta_text}")
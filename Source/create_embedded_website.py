@@ -1,62 +1,164 @@
+import argparse
+import json
+import os
+
 import pandas as pd
 import numpy as np
-import json
 
-# Read the data
-df = pd.read_csv(r"D:\Central forward stat\events.csv")
-ratings_df = pd.read_csv('player_shooting_ratings.csv')
-
-def create_shooting_ability_target(row):
-    """Create target shooting ability score (0-100) based on shot quality factors"""
-    if row['event_type'] != 1:  # Only for shot attempts
-        return np.nan
-    
-    score = 0
-    
-    # Shot placement scoring (40 points max)
-    shot_place_scores = {
-        3: 40, 4: 40, 5: 35, 11: 38, 12: 40, 13: 40, 7: 25,
-        1: 15, 2: 10, 6: 5, 8: 8, 9: 8, 10: 5
-    }
-    score += shot_place_scores.get(row['shot_place'], 0)
-    
-    # Shot outcome scoring (25 points max)
-    outcome_scores = {1: 25, 4: 20, 2: 5, 3: 10}
-    score += outcome_scores.get(row['shot_outcome'], 0)
-    
-    # Location scoring (20 points max)
-    location_scores = {
-        3: 20, 13: 20, 14: 18, 9: 15, 11: 15, 10: 15, 12: 15,
-        15: 10, 16: 8, 6: 5, 7: 6, 8: 6, 17: 3, 18: 2, 1: 8, 4: 7, 5: 7
-    }
-    score += location_scores.get(row['location'], 0)
-    
-    # Body part scoring (8 points max)
-    bodypart_scores = {1: 8, 2: 8, 3: 6}
-    score += bodypart_scores.get(row['bodypart'], 0)
-    
-    # Assist method bonus (4 points max)
-    assist_scores = {0: 2, 1: 4, 2: 3, 3: 3, 4: 4}
-    score += assist_scores.get(row['assist_method'], 0)
-    
-    # Situation bonus (3 points max)
-    situation_scores = {1: 3, 2: 2, 3: 2, 4: 2}
-    score += situation_scores.get(row['situation'], 0)
-    
-    return min(score, 100)
-
-# Create shooting ability scores
-df['shooting_ability_score'] = df.apply(create_shooting_ability_target, axis=1)
-
-# Filter for shot attempts only
-shot_data = df[df['event_type'] == 1].copy()
-shot_data = shot_data.dropna(subset=['shooting_ability_score'])
+from data_loader import add_match_info, load_events, load_matches, matches_path
+from instrumentation import start_run
+from scoring import score_shot_attempts
+from form import FORM_EWMA_SPAN, FORM_MATCH_WINDOW, FORM_SHOT_WINDOW
+from leaderboard import Leaderboard
+from web_payload import (DECODE_BLOCK_JS, SEARCH_JS, build_search_index, compact_json,
+                         encode_shot_block, lowercase_name_index, page_shots, shard_of)
+
+parser = argparse.ArgumentParser(description='Generate the interactive player shooting analysis page')
+parser.add_argument('--sharded', action='store_true',
+                    help='write a small player index plus per-player shot shards that the page '
+                         'fetches on demand, instead of one self-contained HTML file')
+parser.add_argument('--output-dir', default='player_analysis', help='output directory for --sharded')
+parser.add_argument('--shards', type=int, default=64, help='number of shot shards for --sharded')
+parser.add_argument('--metrics', help='run metrics JSON to write (default: $RUN_METRICS or '
+                                      'run_metrics/create_embedded_website.json)')
+parser.add_argument('--profile', help='also write a cProfile dump of the run to this path (default: $RUN_PROFILE)')
+args = parser.parse_args()
+
+metrics = start_run('create_embedded_website', args.metrics, args.profile)
+
+# Read the pruned, typed events table (set EVENTS_CSV to point at events.csv)
+# and the match metadata that dates each event (set GINF_CSV to point at ginf.csv).
+# Without ginf.csv the page is still generated, without match dates or match form
+with metrics.stage('csv_read') as stage:
+    df = load_events()
+    try:
+        matches = load_matches()
+    except FileNotFoundError:
+        matches = None
+        print(f"⚠️ No match metadata at '{matches_path()}' - the page will have no match dates or match form")
+    ratings_df = pd.read_csv('player_shooting_ratings.csv')
+    stage['rows'] = len(df)
+
+# Filter for shot attempts only, score them in one vectorized pass and date them by their match
+with metrics.stage('scoring', rows=len(df)):
+    shot_data = score_shot_attempts(df)
+    if matches is not None:
+        shot_data = add_match_info(shot_data, matches)
 
 print(f"Processing {len(shot_data)} shots...")
 
-# Convert data to JSON for embedding
-players_data = ratings_df.to_dict('records')
-events_data = shot_data.fillna('').to_dict('records')
+
+# Only rated players can be opened, so only their shots are shipped (in career order, with
+# their form from form.py). Profiles are looked up through a prebuilt lowercase name -> position map
+# instead of scanning the player list
+rated_players = list(ratings_df['Player'])
+with metrics.stage('player_shots', rows=len(shot_data)):
+    rated_shots = page_shots(shot_data, rated_players)
+with metrics.stage('player_indexes', rows=len(rated_players)):
+    player_ids = lowercase_name_index(rated_players)
+    # Autocomplete answers from n-gram postings over accent-folded names (see web_payload.py)
+    search_index = build_search_index(rated_players)
+    # The start page lists the top 20 by rating, selected here rather than assumed from list order
+    top_player_ids = [int(rank) for rank in Leaderboard(ratings_df).top(20)]
+
+
+def write_sharded_data(data_dir, shards):
+    """
+    Write data/index.json (every rated player with their ratings, shard and slot in
+    that shard, plus the lowercase name -> player map and top 20), data/search.json
+    (the search index, fetched on the first search) and data/shards/<n>.json (the
+    shots of the players in that shard as one columnar block)
+    """
+    os.makedirs(os.path.join(data_dir, 'shards'), exist_ok=True)
+
+    players = ratings_df.to_dict('records')
+    shard_players = [[] for _ in range(shards)]
+    for player in players:
+        player['shard'] = shard_of(player['Player'], shards)
+        player['slot'] = len(shard_players[player['shard']])
+        shard_players[player['shard']].append(player['Player'])
+
+    index_json = compact_json({'shards': shards, 'players': players, 'ids': player_ids, 'top': top_player_ids})
+    with open(os.path.join(data_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        f.write(index_json)
+    search_json = compact_json(search_index)
+    with open(os.path.join(data_dir, 'search.json'), 'w', encoding='utf-8') as f:
+        f.write(search_json)
+
+    shard_bytes = []
+    shot_shards = rated_shots['player'].astype(object).map(lambda name: shard_of(name, shards)).to_numpy()
+    for number in range(shards):
+        shard_json = compact_json(encode_shot_block(rated_shots[shot_shards == number], shard_players[number]))
+        with open(os.path.join(data_dir, 'shards', f'{number}.json'), 'w', encoding='utf-8') as f:
+            f.write(shard_json)
+        shard_bytes.append(len(shard_json.encode('utf-8')))
+
+    print(f"Index: {len(index_json.encode('utf-8')) / 1024:.0f} KB for {len(players)} players "
+          f"(search index {len(search_json.encode('utf-8')) / 1024:.0f} KB, fetched on first search); "
+          f"{shards} shards averaging {np.mean(shard_bytes) / 1024:.0f} KB "
+          f"(largest {max(shard_bytes) / 1024:.0f} KB)")
+
+
+if args.sharded:
+    # Only the player index is loaded up front; a profile fetches its player's shard
+    with metrics.stage('json_write', rows=len(rated_shots)):
+        write_sharded_data(os.path.join(args.output_dir, 'data'), args.shards)
+    data_script = '''// Data is fetched lazily: the player index up front, the search index on the first
+        // search and one shard of shots per opened profile
+        let playersData = [];
+        let playerIds = {};
+        let topPlayerIds = [];
+        let playerSearch = null;
+        const shardCache = {};
+        const dataReady = fetch('data/index.json')
+            .then(response => response.json())
+            .then(index => {
+                playersData = index.players;
+                playerIds = index.ids;
+                topPlayerIds = index.top;
+                console.log(`Loaded ${playersData.length} players (${index.shards} shot shards)`);
+            });
+
+        function loadPlayerShots(player) {
+            if (!(player.shard in shardCache)) {
+                shardCache[player.shard] = fetch(`data/shards/${player.shard}.json`)
+                    .then(response => response.json())
+                    .then(decodeShotBlock);
+            }
+            return shardCache[player.shard].then(block => playerShotRange(block, player.slot));
+        }
+
+        function loadPlayerSearch() {
+            if (!playerSearch) {
+                playerSearch = Promise.all([fetch('data/search.json').then(response => response.json()), dataReady])
+                    .then(([index]) => createPlayerSearch(index));
+            }
+            return playerSearch;
+        }'''
+else:
+    # Convert data to JSON for embedding. Shots are one columnar block (see web_payload.py),
+    # each carrying its precomputed score, so the page never re-scores shots in the browser
+    with metrics.stage('json_dumps', rows=len(rated_shots)):
+        players_data = ratings_df.to_dict('records')
+        for slot, player in enumerate(players_data):
+            player['slot'] = slot
+        players_json = json.dumps(players_data, indent=2)
+        shot_block_json = compact_json(encode_shot_block(rated_shots, rated_players))
+        search_json = compact_json(search_index)
+    data_script = f'''// Embedded data - no need to load external files
+        const playersData = {players_json};
+        const playerIds = {compact_json(player_ids)};
+        const topPlayerIds = {compact_json(top_player_ids)};
+        const playerSearch = Promise.resolve(createPlayerSearch({search_json}));
+        const loadPlayerSearch = () => playerSearch;
+        const shotBlock = decodeShotBlock({shot_block_json});
+        const dataReady = Promise.resolve();
+
+        console.log(`Loaded ${{playersData.length}} players and ${{shotBlock.length}} shots`);
+
+        function loadPlayerShots(player) {{
+            return Promise.resolve(playerShotRange(shotBlock, player.slot));
+        }}'''
 
 # Create the embedded HTML file
 html_content = f'''<!DOCTYPE html>
@@ -290,22 +392,32 @@ html_content = f'''<!DOCTYPE html>
     </div>
 
     <script>
-        // Embedded data - no need to load external files
-        const playersData = {json.dumps(players_data, indent=2)};
-        const eventsData = {json.dumps(events_data, indent=2)};
-        
-        console.log(`Loaded ${{playersData.length}} players and ${{eventsData.length}} events`);
+        {DECODE_BLOCK_JS}
+
+        {SEARCH_JS}
+
+        // Form windows used by form.py
+        const FORM_SHOT_WINDOW = {FORM_SHOT_WINDOW};
+        const FORM_MATCH_WINDOW = {FORM_MATCH_WINDOW};
+        const FORM_EWMA_SPAN = {FORM_EWMA_SPAN};
+
+        // Shot dates are shipped as day numbers since 1970-01-01
+        function formatDate(dayNumber) {{
+            return new Date(dayNumber * 86400000).toISOString().slice(0, 10);
+        }}
+
+        {data_script}
 
         // Initialize the page
         document.addEventListener('DOMContentLoaded', function() {{
-            loadPlayerList();
+            dataReady.then(loadPlayerList);
         }});
 
         function loadPlayerList() {{
             const playerList = document.getElementById('playerList');
             
             // Show top 20 players by rating
-            const topPlayers = playersData.slice(0, 20);
+            const topPlayers = topPlayerIds.map(position => playersData[position]);
             
             let html = '<div class="row">';
             topPlayers.forEach((player, index) => {{
@@ -331,8 +443,14 @@ html_content = f'''<!DOCTYPE html>
             }}
         }}
 
+        // Case-insensitive lookup through the prebuilt name map
+        function findPlayer(playerName) {{
+            const name = playerName.toLowerCase();
+            return Object.prototype.hasOwnProperty.call(playerIds, name) ? playersData[playerIds[name]] : undefined;
+        }}
+
         function showPlayerProfile(playerName) {{
-            const player = playersData.find(p => p.Player.toLowerCase() === playerName.toLowerCase());
+            const player = findPlayer(playerName);
             
             if (!player) {{
                 alert(`Player "${{playerName}}" not found. Please check the spelling or select from the available players.`);
@@ -340,15 +458,16 @@ html_content = f'''<!DOCTYPE html>
             }}
 
             // Get player shot data
-            const playerShots = eventsData.filter(shot => 
-                shot.player && shot.player.toLowerCase() === playerName.toLowerCase()
-            );
-
-            if (playerShots.length === 0) {{
-                alert(`No shot data found for "${{playerName}}".`);
-                return;
-            }}
+            loadPlayerShots(player).then(playerShots => {{
+                if (playerShots.length === 0) {{
+                    alert(`No shot data found for "${{playerName}}".`);
+                    return;
+                }}
+                renderPlayerProfile(player, playerShots);
+            }});
+        }}
 
+        function renderPlayerProfile(player, playerShots) {{
             // Update player name
             document.getElementById('playerName').textContent = player.Player;
 
@@ -368,7 +487,7 @@ html_content = f'''<!DOCTYPE html>
             updateStatsCards(player);
 
             // Update performance metrics
-            updatePerformanceMetrics(player);
+            updatePerformanceMetrics(player, playerShots);
 
             // Create chart
             createChart(playerShots, player.Player);
@@ -411,7 +530,13 @@ html_content = f'''<!DOCTYPE html>
             `;
         }}
 
-        function updatePerformanceMetrics(player) {{
+        function updatePerformanceMetrics(player, playerShots) {{
+            // Current form is the precomputed form after the player's latest shot
+            // (over their last shots when the page was built without match dates)
+            const columns = playerShots.block.columns;
+            const latest = playerShots.start + playerShots.length - 1;
+            const [formColumn, formWindow] = 'match_form' in columns ?
+                ['match_form', `last ${{FORM_MATCH_WINDOW}} matches`] : ['shot_form', `last ${{FORM_SHOT_WINDOW}} shots`];
             const performanceMetrics = document.getElementById('performanceMetrics');
             performanceMetrics.innerHTML = `
                 <div class="row">
@@ -434,89 +559,88 @@ html_content = f'''<!DOCTYPE html>
                         <span class="text-info">${{(player.Best_Shot - player.Worst_Shot).toFixed(1)}} points</span>
                     </div>
                 </div>
+                <div class="row mt-3">
+                    <div class="col-6">
+                        <strong>Current Form:</strong><br>
+                        <span class="text-primary">${{columns[formColumn][latest].toFixed(1)}}</span>
+                        <small class="text-muted">(${{formWindow}})</small>
+                    </div>
+                    <div class="col-6">
+                        <strong>Form Trend (EWMA):</strong><br>
+                        <span class="text-primary">${{columns.ewma_form[latest].toFixed(1)}}</span>
+                        <small class="text-muted">(last ${{FORM_SHOT_WINDOW}} shots: ${{columns.shot_form[latest].toFixed(1)}})</small>
+                    </div>
+                </div>
             `;
         }}
 
-        function calculateShootingAbility(shot) {{
-            let score = 0;
-            
-            // Shot placement scoring (40 points max)
-            const shotPlaceScores = {{
-                3: 40, 4: 40, 5: 35, 11: 38, 12: 40, 13: 40, 7: 25,
-                1: 15, 2: 10, 6: 5, 8: 8, 9: 8, 10: 5
-            }};
-            score += shotPlaceScores[shot.shot_place] || 0;
-            
-            // Shot outcome scoring (25 points max)
-            const outcomeScores = {{1: 25, 4: 20, 2: 5, 3: 10}};
-            score += outcomeScores[shot.shot_outcome] || 0;
-            
-            // Location scoring (20 points max)
-            const locationScores = {{
-                3: 20, 13: 20, 14: 18, 9: 15, 11: 15, 10: 15, 12: 15,
-                15: 10, 16: 8, 6: 5, 7: 6, 8: 6, 17: 3, 18: 2, 1: 8, 4: 7, 5: 7
-            }};
-            score += locationScores[shot.location] || 0;
-            
-            // Body part scoring (8 points max)
-            const bodypartScores = {{1: 8, 2: 8, 3: 6}};
-            score += bodypartScores[shot.bodypart] || 0;
-            
-            // Assist method bonus (4 points max)
-            const assistScores = {{0: 2, 1: 4, 2: 3, 3: 3, 4: 4}};
-            score += assistScores[shot.assist_method] || 0;
-            
-            // Situation bonus (3 points max)
-            const situationScores = {{1: 3, 2: 2, 3: 2, 4: 2}};
-            score += situationScores[shot.situation] || 0;
-            
-            return Math.min(score, 100);
-        }}
-
         function createChart(playerShots, playerName) {{
             if (playerShots.length === 0) {{
                 document.getElementById('chart').innerHTML = '<p class="text-center text-muted">No shot data available for this player.</p>';
                 return;
             }}
 
-            // Calculate shooting ability for each shot
-            const shotsWithAbility = playerShots.map(shot => ({{
-                ...shot,
-                shooting_ability: calculateShootingAbility(shot),
-                time_minutes: parseFloat(shot.time) || 0
-            }})).sort((a, b) => a.time_minutes - b.time_minutes);
+            // Shots arrive in career order with their score and form precomputed
+            // (scoring.py, form.py); shots of matches without a known date are not plotted.
+            // Pages built without match dates plot shots by number, in data order
+            const {{columns, missing}} = playerShots.block;
+            const hasDates = 'date' in columns;
+            const rows = [];
+            for (let i = 0; i < playerShots.length; i++) {{
+                const row = playerShots.start + i;
+                if (!hasDates || columns.date[row] !== missing.date) rows.push(row);
+            }}
+            const dates = hasDates ? rows.map(row => formatDate(columns.date[row])) : rows.map((row, i) => i + 1);
+            const abilities = rows.map(row => columns.score[row]);
 
             const trace = {{
-                x: shotsWithAbility.map(shot => shot.time_minutes),
-                y: shotsWithAbility.map(shot => shot.shooting_ability),
-                mode: 'markers+lines',
+                x: dates,
+                y: abilities,
+                customdata: rows.map(row => columns.time[row]),
+                mode: 'markers',
                 type: 'scatter',
                 name: 'Shooting Ability',
                 marker: {{
                     size: 8,
-                    color: shotsWithAbility.map(shot => parseInt(shot.is_goal) || 0),
+                    color: rows.map(row => columns.is_goal[row]),
                     colorscale: [[0, 'red'], [1, 'green']],
                     showscale: true,
                     colorbar: {{title: "Goal (1) / No Goal (0)"}}
                 }},
-                line: {{width: 2, color: 'blue'}},
-                hovertemplate: '<b>Time:</b> %{{x}} min<br>' +
+                hovertemplate: (hasDates ? '<b>Date:</b> %{{x}}' : '<b>Shot:</b> %{{x}}') + ' (%{{customdata}} min)<br>' +
                               '<b>Shooting Ability:</b> %{{y}}<br>' +
                               '<b>Goal:</b> %{{marker.color}}<br>' +
                               '<extra></extra>'
             }};
 
-            const avgAbility = shotsWithAbility.reduce((sum, shot) => sum + shot.shooting_ability, 0) / shotsWithAbility.length;
+            const formLine = (column, name, line) => ({{
+                x: dates,
+                y: rows.map(row => columns[column][row]),
+                mode: 'lines',
+                type: 'scatter',
+                name: name,
+                line: line,
+                hovertemplate: `<b>${{name}}:</b> %{{y:.1f}}<extra></extra>`
+            }});
+            // (match form is left out of pages built without match dates)
+            const formTraces = [
+                ['shot_form', `Last ${{FORM_SHOT_WINDOW}} shots`, {{width: 2, color: 'blue'}}],
+                ['match_form', `Last ${{FORM_MATCH_WINDOW}} matches`, {{width: 2, color: 'purple', shape: 'hv'}}],
+                ['ewma_form', `EWMA (span ${{FORM_EWMA_SPAN}} shots)`, {{width: 2, color: 'teal', dash: 'dot'}}]
+            ].filter(([column]) => column in columns).map(spec => formLine(...spec));
+
+            const avgAbility = abilities.reduce((sum, ability) => sum + ability, 0) / abilities.length;
 
             const layout = {{
                 title: `${{playerName}} - Shooting Ability Over Time`,
-                xaxis: {{title: 'Time (minutes)'}},
+                xaxis: hasDates ? {{title: 'Match date', type: 'date'}} : {{title: 'Shot number'}},
                 yaxis: {{title: 'Shooting Ability Score'}},
                 height: 500,
+                legend: {{orientation: 'h', y: -0.2}},
                 shapes: [{{
                     type: 'line',
-                    x0: Math.min(...shotsWithAbility.map(s => s.time_minutes)),
-                    x1: Math.max(...shotsWithAbility.map(s => s.time_minutes)),
+                    x0: dates[0],
+                    x1: dates[dates.length - 1],
                     y0: avgAbility,
                     y1: avgAbility,
                     line: {{
@@ -526,7 +650,8 @@ html_content = f'''<!DOCTYPE html>
                     }}
                 }}],
                 annotations: [{{
-                    x: Math.max(...shotsWithAbility.map(s => s.time_minutes)) * 0.8,
+                    xref: 'paper',
+                    x: 0.8,
                     y: avgAbility + 5,
                     text: `Average: ${{avgAbility.toFixed(1)}}`,
                     showarrow: false,
@@ -534,29 +659,61 @@ html_content = f'''<!DOCTYPE html>
                 }}]
             }};
 
-            Plotly.newPlot('chart', [trace], layout);
+            Plotly.newPlot('chart', [trace, ...formTraces], layout);
         }}
 
+        // The shot history is a virtual list: rows have a fixed height, and only the rows in
+        // (or within HISTORY_OVERSCAN of) the visible part of the panel are in the DOM
+        const HISTORY_ROW_HEIGHT = 60;
+        const HISTORY_OVERSCAN = 10;
+        let historyShots = null;
+        let historyWindow = '';
+        let historyFrame = null;
+
         function updateShotHistory(playerShots) {{
             const shotHistory = document.getElementById('shotHistory');
             
             if (playerShots.length === 0) {{
+                historyShots = null;
                 shotHistory.innerHTML = '<p class="text-muted">No shot data available.</p>';
                 return;
             }}
 
-            // Show all shots
-            const allShots = playerShots.reverse();
+            historyShots = playerShots;
+            historyWindow = '';
+            shotHistory.scrollTop = 0;
+            renderShotHistoryWindow();
+        }}
+
+        function renderShotHistoryWindow() {{
+            historyFrame = null;
+            if (!historyShots) return;
+
+            const shotHistory = document.getElementById('shotHistory');
+            // While the profile is still hidden the panel has no height yet; use its max-height
+            const height = shotHistory.clientHeight || 300;
+            const count = historyShots.length;
+            const first = Math.max(0, Math.floor(shotHistory.scrollTop / HISTORY_ROW_HEIGHT) - HISTORY_OVERSCAN);
+            const last = Math.min(count, Math.ceil((shotHistory.scrollTop + height) / HISTORY_ROW_HEIGHT) + HISTORY_OVERSCAN);
+            if (`${{first}}-${{last}}` === historyWindow) return;
+            historyWindow = `${{first}}-${{last}}`;
+
+            // Show all shots, most recent first: list position i is the player's shot count - 1 - i
+            const {{columns, strings, missing}} = historyShots.block;
             
             let html = '';
-            allShots.forEach(shot => {{
-                const ability = calculateShootingAbility(shot);
-                const isGoal = parseInt(shot.is_goal) === 1;
-                const time = parseFloat(shot.time) || 0;
+            for (let i = first; i < last; i++) {{
+                const row = historyShots.start + count - 1 - i;
+                const ability = columns.score[row];
+                const isGoal = columns.is_goal[row] === 1;
+                const time = columns.time[row];
+                const opponent = strings.team[columns.opponent[row]];
+                const date = !('date' in columns) || columns.date[row] === missing.date ? '' : formatDate(columns.date[row]);
                 
                 html += `
-                    <div class="d-flex justify-content-between align-items-center border-bottom py-2">
+                    <div class="d-flex justify-content-between align-items-center border-bottom py-2" style="height: ${{HISTORY_ROW_HEIGHT}}px;">
                         <div>
+                            <small class="text-muted">${{date}}</small>
                             <strong>${{time.toFixed(0)}}'</strong>
                             ${{isGoal ? 
                                 '<span class="badge bg-success">⚽ GOAL</span>' : 
@@ -565,51 +722,66 @@ html_content = f'''<!DOCTYPE html>
                         </div>
                         <div class="text-end">
                             <div><strong>${{ability.toFixed(1)}}/100</strong></div>
-                            <small class="text-muted">vs ${{shot.opponent || 'Unknown'}}</small>
+                            <small class="text-muted">vs ${{opponent || 'Unknown'}}</small>
                         </div>
                     </div>
                 `;
-            }});
+            }}
             
-            shotHistory.innerHTML = html;
+            // A spacer as tall as the whole list keeps the scrollbar true to the number of shots
+            shotHistory.innerHTML = `
+                <div style="position: relative; height: ${{count * HISTORY_ROW_HEIGHT}}px;">
+                    <div style="position: absolute; top: ${{first * HISTORY_ROW_HEIGHT}}px; left: 0; right: 0;">${{html}}</div>
+                </div>
+            `;
         }}
 
+        document.getElementById('shotHistory').addEventListener('scroll', function() {{
+            if (historyFrame === null) historyFrame = requestAnimationFrame(renderShotHistoryWindow);
+        }});
+
         function showHome() {{
             document.getElementById('homePage').style.display = 'block';
             document.getElementById('playerProfile').style.display = 'none';
             document.getElementById('playerSearch').value = '';
         }}
 
-        // Search functionality
+        // Search functionality: answered from the prebuilt index (loaded on first use)
+        // once typing pauses, and the result list is only rebuilt when the matches change
+        let searchTimer = null;
+        let shownMatches = '';
         document.getElementById('playerSearch').addEventListener('input', function() {{
-            const query = this.value.toLowerCase().trim();
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => showSearchResults(this.value), 100);
+        }});
+
+        function showSearchResults(query) {{
+            loadPlayerSearch().then(searchPlayers => renderSearchResults(searchPlayers(query, 10)));
+        }}
+
+        function renderSearchResults(matches) {{
             const searchResults = document.getElementById('searchResults');
-            
-            if (query.length < 2) {{
-                searchResults.style.display = 'none';
-                return;
-            }}
-            
-            const matches = playersData.filter(player => 
-                player.Player.toLowerCase().includes(query)
-            ).slice(0, 10);
-            
+
             if (matches.length > 0) {{
-                let html = '';
-                matches.forEach(player => {{
-                    html += `
-                        <a href="#" class="list-group-item list-group-item-action" 
-                           onclick="selectPlayer('${{player.Player}}')">
-                            ${{player.Player}} <span class="badge bg-primary float-end">${{player.Overall_Shooting_Rating}}</span>
-                        </a>
-                    `;
-                }});
-                searchResults.innerHTML = html;
+                if (matches.join() !== shownMatches) {{
+                    let html = '';
+                    matches.forEach(position => {{
+                        const player = playersData[position];
+                        html += `
+                            <a href="#" class="list-group-item list-group-item-action" 
+                               onclick="selectPlayer('${{player.Player}}')">
+                                ${{player.Player}} <span class="badge bg-primary float-end">${{player.Overall_Shooting_Rating}}</span>
+                            </a>
+                        `;
+                    }});
+                    searchResults.innerHTML = html;
+                    shownMatches = matches.join();
+                }}
                 searchResults.style.display = 'block';
             }} else {{
                 searchResults.style.display = 'none';
             }}
-        }});
+        }}
 
         function selectPlayer(playerName) {{
             document.getElementById('playerSearch').value = playerName;
@@ -635,6 +807,16 @@ html_content = f'''<!DOCTYPE html>
 </body>
 </html>'''
 
-# Save the embedded HTML file
-with open('player_analysis_embedded.html', 'w', encoding='utf-8') as f:
-    f.write(html_content)
+# Save the HTML file
+if args.sharded:
+    html_path = os.path.join(args.output_dir, 'index.html')
+    print(f"Serve it over HTTP so the page can fetch its data, e.g. "
+          f"python -m http.server --directory {args.output_dir}")
+else:
+    html_path = 'player_analysis_embedded.html'
+with metrics.stage('html_write') as stage:
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    stage['bytes'] = len(html_content.encode('utf-8'))
+print(f"✅ Page saved to '{html_path}' ({stage['bytes'] / 1024:.0f} KB)")
+metrics.finish()
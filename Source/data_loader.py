@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Location of the Kaggle events.csv (override with the EVENTS_CSV environment variable)
+DEFAULT_EVENTS_PATH = r"D:\Central forward stat\events.csv"
+# Location of the Kaggle match metadata ginf.csv (override with the GINF_CSV environment variable)
+DEFAULT_MATCHES_PATH = r"D:\Central forward stat\ginf.csv"
+DEFAULT_CACHE_DIR = '.events_cache'
+DEFAULT_CHUNKSIZE = 200_000
+
+# Columns the pipeline actually uses, with compact dtypes.
+# Free-text and unused columns (text, player2, player_in, ...) are never parsed.
+# Shot factor codes are nullable Int8 because they are empty for non-shot events.
+EVENT_DTYPES = {
+    'id_odsp': 'category',
+    'sort_order': 'int16',
+    'time': 'int8',
+    'event_type': 'int8',
+    'event_team': 'category',
+    'opponent': 'category',
+    'player': 'category',
+    'shot_place': 'Int8',
+    'shot_outcome': 'Int8',
+    'is_goal': 'int8',
+    'location': 'Int8',
+    'bodypart': 'Int8',
+    'assist_method': 'Int8',
+    'situation': 'Int8'
+}
+EVENT_COLUMNS = list(EVENT_DTYPES)
+
+# Match metadata used to place events in time, keyed by id_odsp
+MATCH_DTYPES = {
+    'id_odsp': 'str',
+    'date': 'str',
+    'league': 'category',
+    'season': 'int16'
+}
+MATCH_COLUMNS = list(MATCH_DTYPES)
+MATCH_INFO_COLUMNS = ['date', 'date_ordinal', 'league', 'season']
+
+# Bump when EVENT_DTYPES changes so stale caches are not reused
+CACHE_FORMAT_VERSION = 1
+
+
+def events_path(path=None):
+    """Resolve the events.csv location: explicit path, then $EVENTS_CSV, then the default"""
+    return path or os.environ.get('EVENTS_CSV', DEFAULT_EVENTS_PATH)
+
+
+def matches_path(path=None):
+    """Resolve the ginf.csv location: explicit path, then $GINF_CSV, then the default"""
+    return path or os.environ.get('GINF_CSV', DEFAULT_MATCHES_PATH)
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':  # bytes on macOS, kilobytes elsewhere
+        return peak / 1024 ** 2
+    return peak / 1024
+
+
+def _load_fingerprints(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'fingerprints.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def source_fingerprint(path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    SHA-256 of the source file. The hash is remembered per (size, mtime) so warm
+    runs do not re-read the whole CSV just to validate the cache.
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    stamp = [stat.st_size, stat.st_mtime_ns]
+
+    fingerprints = _load_fingerprints(cache_dir)
+    known = fingerprints.get(key)
+    if known and known['stamp'] == stamp:
+        return known['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    sha256 = digest.hexdigest()
+
+    fingerprints[key] = {'stamp': stamp, 'sha256': sha256}
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, 'fingerprints.json'), 'w', encoding='utf-8') as f:
+        json.dump(fingerprints, f, indent=2)
+    return sha256
+
+
+def read_events_csv(path):
+    """Parse only the needed columns of events.csv straight into compact dtypes"""
+    return pd.read_csv(path, usecols=EVENT_COLUMNS, dtype=EVENT_DTYPES)[EVENT_COLUMNS]
+
+
+def iter_events(path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Stream events.csv in chunks of at most chunksize rows (same columns and
+    dtypes as load_events), so memory stays bounded whatever the file size
+    """
+    reader = pd.read_csv(events_path(path), usecols=EVENT_COLUMNS, dtype=EVENT_DTYPES,
+                         chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            yield chunk[EVENT_COLUMNS]
+
+
+def _cache_paths(cache_dir, sha256):
+    stem = os.path.join(cache_dir, f"events-v{CACHE_FORMAT_VERSION}-{sha256[:16]}")
+    return stem + '.parquet', stem + '.pkl'
+
+
+def _read_cache(cache_dir, sha256):
+    parquet_path, pickle_path = _cache_paths(cache_dir, sha256)
+    if os.path.exists(parquet_path):
+        try:
+            return pd.read_parquet(parquet_path)
+        except ImportError:
+            pass
+    if os.path.exists(pickle_path):
+        return pd.read_pickle(pickle_path)
+    return None
+
+
+def _write_cache(df, cache_dir, sha256):
+    parquet_path, pickle_path = _cache_paths(cache_dir, sha256)
+    os.makedirs(cache_dir, exist_ok=True)
+    try:
+        df.to_parquet(parquet_path, index=False)
+    except ImportError:
+        print("pyarrow not available, caching events as pickle instead of Parquet")
+        df.to_pickle(pickle_path)
+
+
+def load_events(path=None, cache_dir=DEFAULT_CACHE_DIR, use_cache=True, verbose=True):
+    """
+    Load events.csv with column pruning and compact dtypes.
+    The parsed table is cached in cache_dir as Parquet, keyed on the CSV's SHA-256,
+    so warm runs skip CSV parsing entirely.
+    """
+    path = events_path(path)
+    start = time.perf_counter()
+
+    df = None
+    source = 'csv'
+    if use_cache:
+        sha256 = source_fingerprint(path, cache_dir)
+        df = _read_cache(cache_dir, sha256)
+        if df is not None:
+            source = 'cache'
+
+    if df is None:
+        df = read_events_csv(path)
+        if use_cache:
+            _write_cache(df, cache_dir, sha256)
+
+    if verbose:
+        elapsed = time.perf_counter() - start
+        frame_mb = df.memory_usage(deep=True).sum() / 1024 ** 2
+        peak = peak_memory_mb()
+        peak_text = f"{peak:.0f} MB" if peak is not None else "n/a"
+        print(f"Loaded {len(df)} events from {source} in {elapsed:.2f} s "
+              f"(frame {frame_mb:.1f} MB, peak memory {peak_text})")
+    return df
+
+
+def load_matches(path=None):
+    """
+    Load the match metadata (ginf.csv) indexed by id_odsp: match date, its day
+    number since 1970-01-01 (date_ordinal, a compact sortable date), league and season
+    """
+    matches = pd.read_csv(matches_path(path), usecols=MATCH_COLUMNS, dtype=MATCH_DTYPES)
+    matches['date'] = pd.to_datetime(matches['date'])
+    matches['date_ordinal'] = (matches['date'] - pd.Timestamp('1970-01-01')).dt.days.astype('int32')
+    return matches.set_index('id_odsp')[MATCH_INFO_COLUMNS]
+
+
+def match_rows(events, matches):
+    """
+    Row of `matches` for each event (-1 for matches missing from ginf.csv).
+    Each distinct id_odsp is looked up once and events reuse the result through
+    their category codes.
+    """
+    match_ids = events['id_odsp'].astype('category')
+    category_rows = matches.index.get_indexer(match_ids.cat.categories.astype(str))
+    codes = match_ids.cat.codes.to_numpy()
+    return np.where(codes >= 0, category_rows[codes], -1)
+
+
+def add_match_info(events, matches):
+    """
+    Copy of events with the date, date_ordinal, league and season of their match
+    (missing for matches not in ginf.csv)
+    """
+    info = matches.reset_index(drop=True).reindex(match_rows(events, matches))
+    events = events.copy()
+    for column in MATCH_INFO_COLUMNS:
+        events[column] = info[column].to_numpy()
+    events['date_ordinal'] = events['date_ordinal'].astype('Int32')
+    events['season'] = events['season'].astype('Int16')
+    events['league'] = events['league'].astype(matches['league'].dtype)
+    return events
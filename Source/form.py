@@ -0,0 +1,100 @@
+import argparse
+import time
+
+import pandas as pd
+
+from data_loader import add_match_info, load_events, load_matches
+from ratings import MIN_SHOTS_FOR_RATING
+from scoring import score_shot_attempts
+
+DEFAULT_FORM_PATH = 'player_form.csv'
+
+# Form windows: a player's last 10 shots, their last 5 matches, and an
+# exponentially weighted average with a span of 10 shots
+FORM_SHOT_WINDOW = 10
+FORM_MATCH_WINDOW = 5
+FORM_EWMA_SPAN = 10
+FORM_DECIMALS = 1
+
+FORM_COLUMNS = ['shot_form', 'match_form', 'ewma_form']
+# Columns of the exported time series (one row per shot)
+FORM_EXPORT_COLUMNS = ['player', 'id_odsp', 'sort_order', 'date', 'time'] + FORM_COLUMNS
+
+
+def career_order(shots):
+    """
+    Shots sorted by player, then match date (date_ordinal, from add_match_info),
+    match and order within the match. Shots of undated matches go last. Without
+    match dates, each player's shots keep their data order.
+    """
+    if 'date_ordinal' not in shots:
+        return shots.sort_values('player', kind='stable')
+    return shots.sort_values(['player', 'date_ordinal', 'id_odsp', 'sort_order'], na_position='last')
+
+
+def add_form(shots, shot_window=FORM_SHOT_WINDOW, match_window=FORM_MATCH_WINDOW,
+             ewma_span=FORM_EWMA_SPAN):
+    """
+    Each player's form after every shot, computed in one grouped pass over the
+    shots in career order. Returns the shots in career order with:
+      shot_form  - mean score of the player's last shot_window shots
+      match_form - mean score over the player's previous match_window - 1
+                   matches and their shots so far in the shot's match
+      ewma_form  - exponentially weighted mean score (span of ewma_span shots)
+    """
+    shots = career_order(shots)
+    scores = shots['shooting_ability_score'].astype('float64')
+    by_player = scores.groupby(shots['player'], observed=True, sort=False)
+
+    shot_form = by_player.rolling(shot_window, min_periods=1).mean().droplevel(0)
+    ewma_form = by_player.ewm(span=ewma_span).mean().droplevel(0)
+
+    # Score total and shot count of every (player, match); rolling sums over each
+    # player's matches less the match's own total give the previous matches, which
+    # are added to the running total of the shots so far in the shot's match
+    match_keys = [shots['player'], shots['id_odsp']]
+    by_match = scores.groupby(match_keys, observed=True, sort=False)
+    per_match = by_match.agg(['sum', 'count'])
+    recent = per_match.groupby(level=0, observed=True, sort=False).rolling(match_window, min_periods=1).sum()
+    previous = (recent.droplevel(0) - per_match).reindex(pd.MultiIndex.from_arrays(match_keys))
+    match_form = ((previous['sum'].to_numpy() + by_match.cumsum().to_numpy())
+                  / (previous['count'].to_numpy() + by_match.cumcount().to_numpy() + 1))
+
+    shots = shots.copy()
+    shots['shot_form'] = shot_form.round(FORM_DECIMALS)
+    shots['match_form'] = match_form.round(FORM_DECIMALS)
+    shots['ewma_form'] = ewma_form.round(FORM_DECIMALS)
+    return shots
+
+
+def form_table(shots_with_form):
+    """The compact form time series exported to CSV (from add_form's output)"""
+    return shots_with_form[FORM_EXPORT_COLUMNS]
+
+
+def current_form(shots_with_form, min_shots=MIN_SHOTS_FOR_RATING):
+    """Each player's form after their latest shot, for players with at least min_shots shots"""
+    by_player = shots_with_form.groupby('player', observed=True, sort=False)
+    latest = by_player[FORM_COLUMNS].last()
+    return latest[by_player.size() >= min_shots]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rolling and exponentially weighted player form')
+    parser.add_argument('--events', help='path to events.csv (default: $EVENTS_CSV)')
+    parser.add_argument('--matches', help='path to ginf.csv (default: $GINF_CSV)')
+    parser.add_argument('--output', default=DEFAULT_FORM_PATH, help='form time series CSV to write')
+    args = parser.parse_args()
+
+    shot_data = add_match_info(score_shot_attempts(load_events(args.events)), load_matches(args.matches))
+
+    start = time.perf_counter()
+    shots_with_form = add_form(shot_data)
+    elapsed = time.perf_counter() - start
+
+    form_table(shots_with_form).to_csv(args.output, index=False)
+    print(f"Computed form for {len(shots_with_form)} shots of {shots_with_form['player'].nunique()} "
+          f"players in {elapsed:.2f} s")
+    print(f"✅ Player form saved to '{args.output}'")
+    print(f"\nIn form now (last {FORM_MATCH_WINDOW} matches):")
+    print(current_form(shots_with_form).sort_values('match_form', ascending=False).head(10).to_string())
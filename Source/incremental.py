@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DEFAULT_CHUNKSIZE, iter_events
+from ratings import (player_accumulators, ratings_from_summary, summary_from_accumulators,
+                     update_accumulators)
+from scoring import score_shot_attempts
+
+DEFAULT_STATE_PATH = 'rating_state.json'
+STATE_VERSION = 1
+
+ACCUMULATOR_COLUMNS = ['shots', 'score_sum', 'score_sumsq', 'best', 'worst', 'goals']
+
+
+def empty_state():
+    """State with no matches ingested yet"""
+    players = pd.DataFrame({column: pd.Series(dtype=np.int64 if column in ('shots', 'goals') else np.float64)
+                            for column in ACCUMULATOR_COLUMNS})
+    players.index = pd.Index([], dtype=object, name='player')
+    return {'matches': set(), 'players': players}
+
+
+def load_state(path=DEFAULT_STATE_PATH):
+    """Load per-player sufficient statistics and the set of ingested match ids"""
+    if not os.path.exists(path):
+        return empty_state()
+
+    with open(path, encoding='utf-8') as f:
+        saved = json.load(f)
+    if saved.get('version') != STATE_VERSION:
+        raise ValueError(f"{path} has state version {saved.get('version')}, expected {STATE_VERSION}")
+
+    players = pd.DataFrame(saved['players']['columns'], columns=ACCUMULATOR_COLUMNS)
+    players = players.astype({'shots': np.int64, 'goals': np.int64})
+    players.index = pd.Index(saved['players']['index'], dtype=object, name='player')
+    return {'matches': set(saved['matches']), 'players': players}
+
+
+def save_state(state, path=DEFAULT_STATE_PATH):
+    """Write the state atomically so an interrupted run never leaves a half-written file"""
+    players = state['players']
+    saved = {
+        'version': STATE_VERSION,
+        'matches': sorted(state['matches']),
+        'players': {
+            'index': players.index.tolist(),
+            'columns': {column: players[column].tolist() for column in ACCUMULATOR_COLUMNS}
+        }
+    }
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(saved, f)
+    os.replace(temp_path, path)
+
+
+def ingest_events(state, events, known_matches=None):
+    """
+    Fold the shots of unseen matches into the state.
+    Events from matches already in known_matches (default: the state's matches)
+    are ignored, so re-ingesting a match is a no-op.
+    Returns the players whose statistics changed.
+    """
+    if known_matches is None:
+        known_matches = state['matches']
+
+    match_ids = events['id_odsp'].astype(object)
+    new_events = events[~match_ids.isin(known_matches)]
+    if new_events.empty:
+        return pd.Index([], dtype=object)
+
+    partial = player_accumulators(score_shot_attempts(new_events))
+    state['players'] = update_accumulators(state['players'], partial)
+    state['matches'].update(new_events['id_odsp'].astype(object).unique())
+    return partial.index.astype(object)
+
+
+def ingest_file(state, path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Ingest an events CSV (a delta file or the full, appended events.csv).
+    Matches are checked against the state as it was before this file, so a
+    match split across chunks is still ingested completely.
+    """
+    known_matches = set(state['matches'])
+    affected = pd.Index([], dtype=object)
+    for chunk in iter_events(path, chunksize):
+        affected = affected.union(ingest_events(state, chunk, known_matches), sort=False)
+    return affected
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Update player shooting ratings with newly played matches')
+    parser.add_argument('events', nargs='+', help='events CSV files with new matches')
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help='persisted rating state')
+    parser.add_argument('--output', default='player_shooting_ratings.csv', help='ratings CSV to write')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    state = load_state(args.state)
+    matches_before = len(state['matches'])
+
+    affected = pd.Index([], dtype=object)
+    for path in args.events:
+        affected = affected.union(ingest_file(state, path), sort=False)
+
+    new_matches = len(state['matches']) - matches_before
+    if new_matches == 0:
+        print(f"No new matches in {', '.join(args.events)} - ratings unchanged")
+    else:
+        save_state(state, args.state)
+        overall_ratings_df = ratings_from_summary(summary_from_accumulators(state['players']))
+        overall_ratings_df.to_csv(args.output, index=False)
+
+        updated = overall_ratings_df[overall_ratings_df['Player'].isin(affected)]
+        print(f"Ingested {new_matches} new matches in {time.perf_counter() - start:.2f} s")
+        print(f"Updated {len(affected)} players ({len(updated)} with a rating)")
+        print(updated[['Player', 'Overall_Shooting_Rating', 'Shot_Consistency', 'Best_Shot', 'Worst_Shot']]
+              .head(20).to_string(index=False))
+        print(f"\n✅ Player shooting ratings saved to '{args.output}'")
@@ -0,0 +1,173 @@
+import argparse
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+
+from data_loader import peak_memory_mb
+
+DEFAULT_METRICS_DIR = 'run_metrics'
+HISTORY_FILE = 'history.jsonl'
+# compare flags stages at least this much slower (per row, when rows are counted)
+REGRESSION_RATIO = 1.25
+
+
+class RunMetrics:
+    """
+    Counters for the stages of one script run: wall time, CPU time, the
+    process's peak memory after the stage (and how much the stage raised it)
+    and the number of rows it handled.
+
+        metrics = start_run('train_model')
+        with metrics.stage('csv_read') as stage:
+            df = load_events()
+            stage['rows'] = len(df)
+        metrics.finish()
+
+    finish() writes the counters as JSON and appends them to the history file
+    that compare() reads. With a profile path, the whole run is also recorded
+    with cProfile and dumped in pstats format.
+    """
+
+    def __init__(self, script, metrics_path=None, profile_path=None):
+        self.script = script
+        self.metrics_path = metrics_path or os.path.join(DEFAULT_METRICS_DIR, f'{script}.json')
+        self.profile_path = profile_path
+        self.stages = []
+        self.started = time.strftime('%Y-%m-%d %H:%M:%S')
+        self._start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self.profiler = None
+        if profile_path:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Time the enclosed block; set record['rows'] inside it if the count is only known there"""
+        record = {'stage': name, 'rows': rows}
+        peak_before = peak_memory_mb()
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - start
+            peak_after = peak_memory_mb()
+            record['wall_seconds'] = round(wall, 4)
+            record['cpu_seconds'] = round(time.process_time() - cpu_start, 4)
+            if peak_after is not None:
+                record['peak_memory_mb'] = round(peak_after, 1)
+                record['peak_increase_mb'] = round(peak_after - peak_before, 1)
+            if record['rows']:
+                record['rows'] = int(record['rows'])
+                record['rows_per_second'] = round(record['rows'] / wall) if wall > 0 else None
+            self.stages.append(record)
+
+    def summary(self):
+        peak = peak_memory_mb()
+        return {
+            'script': self.script,
+            'started': self.started,
+            'argv': sys.argv[1:],
+            'python': platform.python_version(),
+            'wall_seconds': round(time.perf_counter() - self._start, 4),
+            'cpu_seconds': round(time.process_time() - self._cpu_start, 4),
+            'peak_memory_mb': round(peak, 1) if peak is not None else None,
+            'stages': self.stages
+        }
+
+    def finish(self):
+        """Write the metrics JSON (and the profile), append to the history and print a short report"""
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_path)
+
+        summary = self.summary()
+        metrics_dir = os.path.dirname(self.metrics_path)
+        if metrics_dir:
+            os.makedirs(metrics_dir, exist_ok=True)
+        with open(self.metrics_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        with open(os.path.join(metrics_dir, HISTORY_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(summary) + '\n')
+
+        print(f"\n{'Stage':16} {'Wall s':>8} {'CPU s':>8} {'Peak MB':>8} {'Rows':>10}")
+        for record in self.stages:
+            print(f"{record['stage']:16} {record['wall_seconds']:8.2f} {record['cpu_seconds']:8.2f} "
+                  f"{record.get('peak_memory_mb') or 0:8.0f} {record['rows'] or '':>10}")
+        print(f"📊 Run metrics saved to '{self.metrics_path}'"
+              + (f", profile to '{self.profile_path}'" if self.profiler is not None else ''))
+        return summary
+
+
+def start_run(script, metrics_path=None, profile_path=None):
+    """
+    Start collecting metrics for a script. Paths default to $RUN_METRICS (else
+    run_metrics/<script>.json) and $RUN_PROFILE (no profile when unset).
+    """
+    return RunMetrics(script,
+                      metrics_path or os.environ.get('RUN_METRICS'),
+                      profile_path or os.environ.get('RUN_PROFILE'))
+
+
+def _seconds_per_row(record):
+    return record['wall_seconds'] / record['rows'] if record.get('rows') else None
+
+
+def compare(previous, current, threshold=REGRESSION_RATIO):
+    """
+    Stage by stage comparison of two runs of the same script. Stages with row
+    counts are compared per row, so more input data is not mistaken for a
+    regression but a stage that scales worse than linearly is flagged.
+    """
+    before = {record['stage']: record for record in previous['stages']}
+    rows = []
+    for record in current['stages']:
+        old = before.get(record['stage'])
+        if old is None:
+            rows.append((record['stage'], None, record['wall_seconds'], None, False))
+            continue
+        old_cost, new_cost = _seconds_per_row(old), _seconds_per_row(record)
+        if old_cost is None or new_cost is None:
+            old_cost, new_cost = old['wall_seconds'], record['wall_seconds']
+        ratio = new_cost / old_cost if old_cost > 0 else None
+        rows.append((record['stage'], old['wall_seconds'], record['wall_seconds'], ratio,
+                     ratio is not None and ratio >= threshold))
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compare the latest instrumented run of each script with the one before')
+    parser.add_argument('--history', default=os.path.join(DEFAULT_METRICS_DIR, HISTORY_FILE),
+                        help='run history written by the instrumented scripts')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_RATIO,
+                        help='flag stages whose time (per row) grew by at least this ratio')
+    args = parser.parse_args()
+
+    # Runs are compared with earlier runs of the same script and arguments
+    runs = {}
+    with open(args.history, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                run = json.loads(line)
+                runs.setdefault(' '.join([run['script']] + run['argv']), []).append(run)
+
+    regressions = 0
+    for script, script_runs in runs.items():
+        if len(script_runs) < 2:
+            print(f"{script}: only one run recorded ({script_runs[0]['started']})")
+            continue
+        previous, current = script_runs[-2], script_runs[-1]
+        print(f"\n{script}: {previous['started']} -> {current['started']}")
+        print(f"{'Stage':16} {'Before s':>9} {'After s':>9} {'Ratio':>7}")
+        for stage, before, after, ratio, regressed in compare(previous, current, args.threshold):
+            regressions += regressed
+            before = f'{before:.2f}' if before is not None else '-'
+            print(f"{stage:16} {before:>9} {after:9.2f} "
+                  f"{f'{ratio:.2f}' if ratio is not None else '-':>7}" + ("  ⚠️ slower" if regressed else ''))
+    print(f"\n{regressions} stage(s) slower by {args.threshold:.2f}x or more")
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_TOP_N = 20
+
+# Filters on the teams a player shot for / against, by shot column (league needs add_match_info)
+KEY_FILTER_COLUMNS = {'team': 'event_team', 'opponent': 'opponent', 'league': 'league'}
+
+# Matches are collected from the most selective filter's ranks in blocks of
+# this size, doubling each time, so a top-N query stops soon after N matches
+FIRST_BLOCK = 256
+
+_NO_RANKS = np.empty(0, dtype=np.int64)
+
+
+def top_rows(frame, column, n=DEFAULT_TOP_N):
+    """
+    The n rows with the largest `column`, best first, in the order of
+    sort_values(column, ascending=False). That sort is not stable (quicksort),
+    so no partial selection reproduces its tie order; the whole frame is sorted.
+    """
+    return frame.sort_values(column, ascending=False).head(n)
+
+
+def _contains(ranks):
+    """Membership test on a sorted rank array (works on a rank or an array of ranks)"""
+    if not len(ranks):
+        return lambda rank: np.zeros(np.shape(rank), dtype=bool)
+    last = len(ranks) - 1
+    return lambda rank: ranks[np.minimum(ranks.searchsorted(rank), last)] == rank
+
+
+class Leaderboard:
+    """
+    Top-N queries over a ratings table in rating order (the output of
+    calculate_player_ratings / ratings_from_summary). A player's rank is their
+    row in that table, and every query returns ranks in ascending order, so
+    results always follow the table's order, ties included.
+
+    Built once:
+      - for every team, opponent and league: the sorted ranks of the players
+        with a shot for / against / in it
+      - the distinct shot counts; the sorted ranks of the players at or above
+        a count are built the first time that min_shots is asked for, then kept
+      - ratings in rank order, so a rating band is a binary-searched range
+
+    A query walks the ranks of its most selective filter in order, checks the
+    other filters on whole blocks of them and stops after offset + n matches.
+    """
+
+    def __init__(self, ratings, shot_data=None):
+        ratings = ratings.reset_index(drop=True)
+        self.players = ratings['Player'].astype(object).to_numpy()
+        self.rating = ratings['Overall_Shooting_Rating'].to_numpy(dtype=np.float64)
+        if (np.diff(self.rating) > 0).any():
+            raise ValueError("Leaderboard needs the ratings sorted by Overall_Shooting_Rating, highest first")
+
+        self.total_shots = ratings['Total_Shots'].to_numpy()
+        self.shot_levels = np.unique(self.total_shots)
+        self._min_shots_ranks = {}
+
+        self.key_ranks = {name: {} for name in KEY_FILTER_COLUMNS}
+        if shot_data is not None:
+            ranks = pd.Series(np.arange(len(self.players)), index=self.players)
+            shots = shot_data[shot_data['player'].astype(object).isin(ranks.index)]
+            shot_ranks = ranks.reindex(shots['player'].astype(object)).to_numpy()
+            for name, column in KEY_FILTER_COLUMNS.items():
+                if column in shots:
+                    self.key_ranks[name] = self._ranks_by(shots[column], shot_ranks)
+
+    @staticmethod
+    def _ranks_by(keys, shot_ranks):
+        """Lowercase key -> sorted ranks of the players with a shot under that key"""
+        pairs = pd.DataFrame({'key': keys.astype(object), 'rank': shot_ranks}).dropna()
+        pairs = pairs.drop_duplicates().sort_values('rank')
+        return {str(key).lower(): group.to_numpy(dtype=np.int64)
+                for key, group in pairs.groupby('key', sort=False)['rank']}
+
+    def __len__(self):
+        return len(self.players)
+
+    def keys(self, name):
+        """Known (lowercase) teams, opponents or leagues"""
+        return sorted(self.key_ranks[name])
+
+    def _min_shots_ranks_at(self, level):
+        """Sorted ranks of the players with at least shot_levels[level] shots"""
+        if level not in self._min_shots_ranks:
+            self._min_shots_ranks[level] = np.flatnonzero(self.total_shots >= self.shot_levels[level])
+        return self._min_shots_ranks[level]
+
+    def _filters(self, team=None, opponent=None, league=None, min_shots=None, rating_band=None):
+        """
+        One (ranks, contains) pair per active filter, most selective first:
+        ranks is the sorted array (or range) of the players passing it and
+        contains(ranks) tests an array of ranks against it
+        """
+        filters = []
+        for name, key in (('team', team), ('opponent', opponent), ('league', league)):
+            if key is not None:
+                ranks = self.key_ranks[name].get(str(key).lower(), _NO_RANKS)
+                filters.append((ranks, _contains(ranks)))
+
+        level = 0 if min_shots is None else int(self.shot_levels.searchsorted(min_shots))
+        if level == len(self.shot_levels):
+            filters.append((_NO_RANKS, lambda ranks: np.zeros(len(ranks), dtype=bool)))
+        elif level > 0:
+            filters.append((self._min_shots_ranks_at(level), lambda ranks: self.total_shots[ranks] >= min_shots))
+
+        if rating_band is not None:
+            # Ratings are non-increasing, so low <= rating <= high is one range of ranks
+            low, high = rating_band
+            start = int(np.searchsorted(-self.rating, -high, side='left'))
+            end = max(start, int(np.searchsorted(-self.rating, -low, side='right')))
+            filters.append((range(start, end), lambda ranks: (ranks >= start) & (ranks < end)))
+
+        return sorted(filters, key=lambda f: len(f[0]))
+
+    def _matching(self, filters, count=None):
+        """The first `count` (default: all) ranks passing every filter, in rank order"""
+        (driver, _), others = filters[0], filters[1:]
+        chunks, found, start = [], 0, 0
+        block = FIRST_BLOCK if count is not None else max(len(driver), 1)
+        while start < len(driver) and (count is None or found < count):
+            ranks = driver[start:start + block]
+            ranks = np.arange(ranks.start, ranks.stop) if isinstance(ranks, range) else ranks
+            for _, contains in others:
+                ranks = ranks[contains(ranks)]
+            chunks.append(ranks)
+            found += len(ranks)
+            start += block
+            block *= 2
+        return np.concatenate(chunks)[:count] if chunks else _NO_RANKS
+
+    def top(self, n=DEFAULT_TOP_N, offset=0, **filters):
+        """Ranks of the best rated players matching the filters, from the offset-th match on"""
+        active = self._filters(**filters)
+        if not active:
+            return np.arange(min(offset, len(self)), min(offset + n, len(self)))
+        return self._matching(active, offset + n)[offset:]
+
+    def count(self, **filters):
+        """Number of players matching the filters"""
+        active = self._filters(**filters)
+        if not active:
+            return len(self)
+        if len(active) == 1:
+            return len(active[0][0])
+        return len(self._matching(active))
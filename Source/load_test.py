@@ -0,0 +1,168 @@
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(events=None, matches=None, timeout=300):
+    """Run server.py in a subprocess on a free port and wait until it answers"""
+    port = free_port()
+    command = [sys.executable, SERVER_SCRIPT, '--port', str(port)]
+    if events:
+        command += ['--events', events]
+    if matches:
+        command += ['--matches', matches]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server.py exited with code {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/')
+            connection.getresponse().read()
+            return process, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("server.py did not start in time")
+
+
+def get_json(connection, path):
+    connection.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+    response = connection.getresponse()
+    body = response.read()
+    if response.getheader('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def request_mix(connection, count, seed=0):
+    """
+    Random request paths in a typical interactive mix: 20% player lookups,
+    20% profiles, 30% shot history pages and 30% (filtered) top-N pages
+    """
+    summary = get_json(connection, '/')
+    names = []
+    path = '/top?limit=500'
+    while path:
+        page = get_json(connection, path)
+        names += [player['Player'] for player in page['items']]
+        path = f"/top?limit=500&offset={page['next_offset']}" if page['next_offset'] is not None else None
+
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        kind = rng.random()
+        name = quote(rng.choice(names))
+        if kind < 0.2:
+            paths.append(f'/players/{name}')
+        elif kind < 0.4:
+            paths.append(f'/players/{name}/profile')
+        elif kind < 0.7:
+            paths.append(f"/players/{name}/shots?limit=20&offset={rng.choice([0, 0, 20])}"
+                         f"&order={rng.choice(['asc', 'desc'])}")
+        else:
+            filters = [f'limit={rng.choice([10, 50])}']
+            if rng.random() < 0.5 and summary['leagues']:
+                filters.append(f"league={quote(rng.choice(summary['leagues']))}")
+            if rng.random() < 0.3 and summary['teams']:
+                filters.append(f"team={quote(rng.choice(summary['teams']))}")
+            if rng.random() < 0.5:
+                filters.append(f"min_shots={rng.choice([5, 10, 20])}")
+            paths.append('/top?' + '&'.join(filters))
+    return paths
+
+
+def run_load(base_url, paths, concurrency, revalidate):
+    """
+    Replay the paths from `concurrency` threads, each on its own keep-alive
+    connection. With revalidate, a thread sends If-None-Match for paths it has
+    already fetched, like a browser cache. Returns latencies (s), statuses and
+    the wall time.
+    """
+    url = urlsplit(base_url)
+    latencies = np.empty(len(paths))
+    statuses = Counter()
+    lock = threading.Lock()
+    local = threading.local()
+
+    def fetch(i):
+        if not hasattr(local, 'connection'):
+            local.connection = http.client.HTTPConnection(url.hostname, url.port)
+            local.etags = {}
+        headers = {'Accept-Encoding': 'gzip'}
+        if revalidate and paths[i] in local.etags:
+            headers['If-None-Match'] = local.etags[paths[i]]
+
+        start = time.perf_counter()
+        local.connection.request('GET', paths[i], headers=headers)
+        response = local.connection.getresponse()
+        response.read()
+        latencies[i] = time.perf_counter() - start
+
+        if response.getheader('ETag'):
+            local.etags[paths[i]] = response.getheader('ETag')
+        with lock:
+            statuses[response.status] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, range(len(paths))))
+    return latencies, statuses, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test for server.py: latency percentiles and throughput')
+    parser.add_argument('--url', help='URL of a running server.py (default: start one)')
+    parser.add_argument('--events', help='events.csv for the started server (default: $EVENTS_CSV)')
+    parser.add_argument('--matches', help='ginf.csv for the started server (default: $GINF_CSV)')
+    parser.add_argument('--requests', type=int, default=5000, help='number of requests')
+    parser.add_argument('--concurrency', type=int, default=8, help='parallel keep-alive connections')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='send If-None-Match for paths already fetched (answered with 304)')
+    args = parser.parse_args()
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        process, base_url = start_server(args.events, args.matches)
+    try:
+        url = urlsplit(base_url)
+        paths = request_mix(http.client.HTTPConnection(url.hostname, url.port), args.requests)
+        run_load(base_url, paths[:min(200, len(paths))], args.concurrency, False)  # warm up
+        latencies, statuses, elapsed = run_load(base_url, paths, args.concurrency, args.revalidate)
+        cache = get_json(http.client.HTTPConnection(url.hostname, url.port), '/cache')
+    finally:
+        if process is not None:
+            process.terminate()
+
+    milliseconds = latencies * 1000
+    print(f"{len(paths)} requests, {args.concurrency} connections against {base_url}")
+    print(f"Throughput: {len(paths) / elapsed:,.0f} requests/s")
+    print(f"Latency: p50 {np.percentile(milliseconds, 50):.2f} ms, p95 {np.percentile(milliseconds, 95):.2f} ms, "
+          f"p99 {np.percentile(milliseconds, 99):.2f} ms, max {milliseconds.max():.2f} ms")
+    print("Status codes: " + ', '.join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+    print(f"Profile cache: {cache['size']}/{cache['maxsize']} entries, hit rate {cache['hit_rate']}, "
+          f"{cache['evictions']} evictions")
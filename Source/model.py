@@ -0,0 +1,233 @@
+from collections.abc import Mapping
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from scoring import FEATURES
+
+# Random Forest settings used throughout the project
+RF_PARAMS = {'n_estimators': 100, 'max_depth': 10, 'random_state': 42}
+
+# Valid code range (inclusive) of each feature, from dictionary.txt
+FEATURE_CODE_RANGES = {
+    'shot_place': (1, 13),
+    'shot_outcome': (1, 4),
+    'location': (1, 19),
+    'bodypart': (1, 3),
+    'assist_method': (0, 4),
+    'situation': (1, 4)
+}
+
+
+def feature_matrix(shot_data, features=FEATURES):
+    """
+    Pack the six categorical shot features into one contiguous float32 matrix.
+    float32 is the dtype sklearn's trees work in, so fitting and predicting use
+    this buffer directly instead of converting (and copying) the DataFrame.
+    Missing codes become NaN.
+    """
+    X = np.empty((len(shot_data), len(features)), dtype=np.float32)
+    for i, feature in enumerate(features):
+        X[:, i] = shot_data[feature].to_numpy(dtype=np.float32, na_value=np.nan)
+    return X
+
+
+def train_shooting_model(X_train, y_train, n_jobs=-1, sample_weight=None, **params):
+    """
+    Fit the shooting ability Random Forest on every available core (n_jobs=-1).
+    Trees are built in threads that share X_train, and the fitted forest is
+    identical to a single-threaded fit with the same random_state.
+    sample_weight counts each row that many times (see collapse_duplicates).
+    """
+    # Imported here so that loading a saved model does not pull in sklearn.ensemble
+    from sklearn.ensemble import RandomForestRegressor
+
+    rf_params = {**RF_PARAMS, **params}
+    rf_model = RandomForestRegressor(n_jobs=n_jobs, **rf_params)
+    rf_model.fit(X_train, y_train, sample_weight=sample_weight)
+    return rf_model
+
+
+def collapse_duplicates(X, y):
+    """
+    The distinct (feature tuple, target) rows of X and y with how often each
+    occurs. Shots are six small categorical codes, so ~229k rows collapse to a
+    few thousand; fitting on them with the counts as sample weights gives every
+    split the same impurity as the full rows (bootstrap draws then sample
+    distinct tuples rather than shots). Missing codes (NaN) group together.
+    """
+    rows = pd.DataFrame(X).assign(target=np.asarray(y, dtype=np.float64))
+    counts = rows.groupby(list(rows.columns), dropna=False, sort=True).size()
+    unique = counts.index.to_frame(index=False).to_numpy(dtype=np.float64)
+    return (np.ascontiguousarray(unique[:, :-1], dtype=np.float32), unique[:, -1],
+            counts.to_numpy(dtype=np.float64))
+
+
+def forest_predict(rf_model, X):
+    """
+    Average the trees' predictions in estimator order, exactly as a
+    single-threaded rf_model.predict does (threaded predict may add the
+    trees in a different order and differ in the last bit)
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    total = np.zeros(len(X), dtype=np.float64)
+    for tree in rf_model.estimators_:
+        total += tree.predict(X, check_input=False)
+    total /= len(rf_model.estimators_)
+    return total
+
+
+class CompiledForest:
+    """
+    Exact lookup-table predictor for the six-feature categorical model.
+
+    The forest is evaluated once for every code tuple in FEATURE_CODE_RANGES
+    (13 x 4 x 19 x 3 x 5 x 4 = 59,280 combinations) and once for any other
+    tuple seen in `observed` (e.g. shots with a missing code). Predictions are
+    then served by array indexing; tuples never seen fall back to the forest.
+    """
+
+    def __init__(self, rf_model, features=FEATURES, observed=None):
+        self._set_model(rf_model, features)
+
+        # Every possible code tuple, in the same C order as np.ravel_multi_index
+        ranges = [FEATURE_CODE_RANGES[feature] for feature in self.features]
+        axes = [np.arange(low, high + 1) for low, high in ranges]
+        grid = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(ranges))
+        self.table = forest_predict(rf_model, grid)
+
+        # Observed tuples outside the grid, keyed by their float64 bytes
+        self.extra = {}
+        if observed is not None:
+            observed = np.asarray(observed, dtype=np.float64)
+            outside = np.unique(observed[~self._in_range(observed)], axis=0)
+            if len(outside):
+                values = forest_predict(rf_model, outside)
+                self.extra = {row.tobytes(): value for row, value in zip(outside, values)}
+
+    @classmethod
+    def from_saved(cls, rf_model, features, table, extra):
+        """Rebuild a compiled predictor from a saved table without touching the forest"""
+        compiled = cls.__new__(cls)
+        compiled._set_model(rf_model, features)
+        compiled.table = table
+        compiled.extra = extra
+        return compiled
+
+    def _set_model(self, rf_model, features):
+        self.rf_model = rf_model
+        self.features = list(features)
+        ranges = [FEATURE_CODE_RANGES[feature] for feature in self.features]
+        self.low = np.array([low for low, _ in ranges], dtype=np.int64)
+        self.high = np.array([high for _, high in ranges], dtype=np.int64)
+        self.shape = tuple(self.high - self.low + 1)
+
+    def predict(self, X):
+        """Predict scores for an (n, 6) array of feature codes"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        in_range = self._in_range(X)
+        if in_range.all():
+            return self.table[self._flat_index(X)]
+
+        predictions = np.empty(len(X), dtype=np.float64)
+        predictions[in_range] = self.table[self._flat_index(X[in_range])]
+
+        outside = np.flatnonzero(~in_range)
+        cached = [self.extra.get(X[i].tobytes()) for i in outside]
+        unseen = np.array([value is None for value in cached], dtype=bool)
+        predictions[outside[~unseen]] = [value for value in cached if value is not None]
+        if unseen.any():
+            predictions[outside[unseen]] = forest_predict(self.rf_model, X[outside[unseen]])
+        return predictions
+
+    def _in_range(self, X):
+        return ((X >= self.low) & (X <= self.high) & (X == np.floor(X))).all(axis=1)
+
+    def _flat_index(self, X):
+        codes = X.astype(np.int64) - self.low
+        return np.ravel_multi_index(tuple(codes.T), self.shape)
+
+
+def compile_forest(rf_model, features=FEATURES, observed=None):
+    """Precompute rf_model over every possible (and every observed) code tuple"""
+    return CompiledForest(rf_model, features, observed)
+
+
+def shots_to_matrix(shots, features=FEATURES):
+    """
+    Convert shots to an (n, 6) float64 code matrix in feature order.
+    Accepts a DataFrame, a structured NumPy array, a plain (n, 6) array or an
+    iterable of shot records (dicts keyed by feature name, or 6-value sequences).
+    Missing codes become NaN; non-numeric codes raise ValueError.
+    """
+    if isinstance(shots, pd.DataFrame) or (isinstance(shots, np.ndarray) and shots.dtype.names):
+        fields = shots.columns if isinstance(shots, pd.DataFrame) else shots.dtype.names
+        missing = [feature for feature in features if feature not in fields]
+        if missing:
+            raise ValueError(f"Shots are missing feature fields: {missing}")
+
+        X = np.empty((len(shots), len(features)), dtype=np.float64)
+        for i, feature in enumerate(features):
+            column = shots[feature]
+            if isinstance(column, pd.Series):
+                column = column.to_numpy(dtype=np.float64, na_value=np.nan)
+            X[:, i] = column
+        return X
+
+    records = shots if isinstance(shots, np.ndarray) else list(shots)
+    if len(records) == 0:
+        return np.empty((0, len(features)), dtype=np.float64)
+    if isinstance(records[0], Mapping):
+        records = [[record.get(feature) for feature in features] for record in records]
+
+    X = np.asarray(records, dtype=np.float64)
+    if X.ndim != 2 or X.shape[1] != len(features):
+        raise ValueError(f"Expected {len(features)} feature codes per shot, got shape {X.shape}")
+    return X
+
+
+def clip_codes(X, features=FEATURES):
+    """
+    Clip numeric codes into each feature's dictionary range.
+    Every split threshold of a tree trained on in-range codes lies inside the
+    range, so a code above (below) it follows exactly the same path as the
+    highest (lowest) code and the prediction is unchanged, but now hits the
+    lookup table. Missing codes (NaN) are left as they are.
+    """
+    low = np.array([FEATURE_CODE_RANGES[feature][0] for feature in features], dtype=np.float64)
+    high = np.array([FEATURE_CODE_RANGES[feature][1] for feature in features], dtype=np.float64)
+    return np.clip(X, low, high)
+
+
+def predict_batch(model, shots, features=FEATURES):
+    """
+    Predict shooting ability scores (0-100) for a batch of shots.
+
+    `model` is a CompiledForest (or anything with a predict method) and `shots`
+    is anything shots_to_matrix accepts. Codes are validated and clipped in one
+    vectorized pass. With a CompiledForest, a 77k-shot batch on one core runs
+    at ~0.4 µs per shot (about 2.5 million shots/s) from a DataFrame or array
+    and ~3.5 µs per shot from a list of dicts. rf_model.predict takes ~11 µs per
+    shot and a single forest call ~10 ms (see benchmark_prediction.py).
+    """
+    X = clip_codes(shots_to_matrix(shots, features), features)
+    if len(X) == 0:
+        return np.empty(0, dtype=np.float64)
+    return np.clip(model.predict(X), 0, 100)  # Ensure scores are between 0-100
+
+
+def iter_predict(model, shots, batch_size=1024, features=FEATURES):
+    """
+    Score a stream of shot records (e.g. a live match feed) in micro-batches,
+    yielding one score array per batch of at most batch_size shots
+    """
+    records = iter(shots)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield predict_batch(model, batch, features)
@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from model import RF_PARAMS, CompiledForest, predict_batch
+from scoring import FEATURES, RULES_VERSION
+
+DEFAULT_MODEL_DIR = 'shooting_model'
+
+# Bump when the files written by save_model change
+ARTIFACT_FORMAT_VERSION = 1
+
+
+def data_fingerprint(X, y):
+    """SHA-256 of the training features and targets"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X, dtype=np.float32).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class _LazyForest:
+    """
+    Stands in for the fitted forest and only unpickles it (importing sklearn)
+    the first time it is actually needed, e.g. for a code tuple outside the
+    lookup table or for feature_importances_
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = joblib.load(self.path, mmap_mode='r')
+        return self._model
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def save_model(compiled_model, path=DEFAULT_MODEL_DIR, fingerprint=None):
+    """
+    Write a compiled model as a versioned artifact directory:
+      metadata.json  - format version, feature order, scoring rules version,
+                       Random Forest parameters and training data fingerprint
+      table.npy      - lookup table over every possible code tuple (memory-mappable)
+      extra.npz      - observed tuples outside the grid and their predictions
+      forest.joblib  - the fitted forest (uncompressed, so it can be memory-mapped)
+    """
+    os.makedirs(path, exist_ok=True)
+    if os.path.exists(os.path.join(path, 'metadata.json')):
+        os.remove(os.path.join(path, 'metadata.json'))
+
+    rf_model = compiled_model.rf_model
+    if isinstance(rf_model, _LazyForest):
+        rf_model = rf_model.model
+
+    joblib.dump(rf_model, os.path.join(path, 'forest.joblib'))
+    np.save(os.path.join(path, 'table.npy'), compiled_model.table)
+    extra_codes = np.array([np.frombuffer(key, dtype=np.float64) for key in compiled_model.extra],
+                           dtype=np.float64).reshape(-1, len(compiled_model.features))
+    np.savez(os.path.join(path, 'extra.npz'), codes=extra_codes,
+             values=np.array(list(compiled_model.extra.values()), dtype=np.float64))
+
+    metadata = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'features': compiled_model.features,
+        'rules_version': RULES_VERSION,
+        'rf_params': {key: rf_model.get_params()[key] for key in RF_PARAMS},
+        'data_fingerprint': fingerprint,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+    # Metadata is written last, so a partially written artifact is never loadable
+    with open(os.path.join(path, 'metadata.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+
+
+def read_metadata(path=DEFAULT_MODEL_DIR):
+    with open(os.path.join(path, 'metadata.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_model(path=DEFAULT_MODEL_DIR, fingerprint=None, rf_params=None):
+    """
+    Load a saved model for scoring. The lookup table is memory-mapped and the
+    forest is only unpickled if a prediction needs it, so this takes
+    milliseconds and never retrains.
+
+    Raises FileNotFoundError if there is no artifact and ValueError if it was
+    built with other scoring rules, another feature order or format, or (when
+    given) different training data or Random Forest parameters.
+    """
+    metadata = read_metadata(path)
+
+    problems = []
+    if metadata.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        problems.append(f"format version {metadata.get('format_version')} != {ARTIFACT_FORMAT_VERSION}")
+    if metadata.get('rules_version') != RULES_VERSION:
+        problems.append(f"scoring rules {metadata.get('rules_version')} != current {RULES_VERSION}")
+    if metadata.get('features') != FEATURES:
+        problems.append(f"features {metadata.get('features')} != {FEATURES}")
+    if fingerprint is not None and metadata.get('data_fingerprint') != fingerprint:
+        problems.append("training data fingerprint does not match")
+    if rf_params is not None and metadata.get('rf_params') != rf_params:
+        problems.append(f"Random Forest parameters {metadata.get('rf_params')} != {rf_params}")
+    if problems:
+        raise ValueError(f"Stale model artifact in '{path}': " + '; '.join(problems))
+
+    table = np.load(os.path.join(path, 'table.npy'), mmap_mode='r')
+    with np.load(os.path.join(path, 'extra.npz')) as saved:
+        extra = {codes.tobytes(): value for codes, value in zip(saved['codes'], saved['values'])}
+    forest = _LazyForest(os.path.join(path, 'forest.joblib'))
+    return CompiledForest.from_saved(forest, metadata['features'], table, extra)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Score shots with a saved model (no retraining)')
+    parser.add_argument('shots', help='CSV with shot_place, shot_outcome, location, bodypart, '
+                                      'assist_method and situation columns')
+    parser.add_argument('--model', default=DEFAULT_MODEL_DIR, help='saved model directory')
+    parser.add_argument('--output', help='write the shots with a predicted_score column to this CSV')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    compiled_model = load_model(args.model)
+    load_time = time.perf_counter() - start
+
+    shots = pd.read_csv(args.shots)
+    start = time.perf_counter()
+    shots['predicted_score'] = predict_batch(compiled_model, shots)
+    score_time = time.perf_counter() - start
+
+    print(f"Loaded model in {load_time * 1000:.1f} ms, scored {len(shots)} shots in {score_time * 1000:.1f} ms")
+    if args.output:
+        shots.to_csv(args.output, index=False)
+        print(f"✅ Scores saved to '{args.output}'")
+    else:
+        print(shots.head(10).to_string(index=False))
@@ -0,0 +1,344 @@
+import argparse
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from data_loader import events_path, load_events, source_fingerprint
+from model import RF_PARAMS, compile_forest, feature_matrix, train_shooting_model
+from model_store import DEFAULT_MODEL_DIR, data_fingerprint, load_model, save_model
+from ratings import calculate_player_ratings
+from reports import render_report, report_data
+from scoring import FEATURES, score_shot_attempts
+
+DEFAULT_PIPELINE_DIR = '.pipeline_cache'
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Train/test split used by train_model.py
+TEST_SIZE = 0.2
+SPLIT_SEED = 42
+
+
+def _split(shot_data):
+    from sklearn.model_selection import train_test_split
+
+    X = feature_matrix(shot_data, FEATURES)
+    y = shot_data['shooting_ability_score']
+    return X, y, train_test_split(X, y, test_size=TEST_SIZE, random_state=SPLIT_SEED)
+
+
+# Stages read their inputs from, and write their output to, files, so they can
+# run in any worker process. Each takes {input name: path} and the output path.
+
+def load_stage(inputs, output):
+    load_events(inputs['events'], verbose=False).to_pickle(output)
+
+
+def score_stage(inputs, output):
+    score_shot_attempts(pd.read_pickle(inputs['load'])).to_pickle(output)
+
+
+def train_stage(inputs, output):
+    shot_data = pd.read_pickle(inputs['score'])
+    X, y, (X_train, _, y_train, _) = _split(shot_data)
+    rf_model = train_shooting_model(X_train, y_train)
+    save_model(compile_forest(rf_model, observed=X), output, fingerprint=data_fingerprint(X, y))
+
+
+def evaluate_stage(inputs, output):
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    _, _, (_, X_test, _, y_test) = _split(pd.read_pickle(inputs['score']))
+    compiled_model = load_model(inputs['train'])
+    y_pred = compiled_model.predict(X_test)
+    mse = mean_squared_error(y_test, y_pred)
+    metrics = {
+        'mse': round(mse, 4),
+        'rmse': round(float(np.sqrt(mse)), 4),
+        'r2': round(r2_score(y_test, y_pred), 4),
+        'feature_importance': dict(zip(FEATURES, compiled_model.rf_model.feature_importances_.round(4).tolist()))
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2)
+
+
+def ratings_stage(inputs, output):
+    calculate_player_ratings(pd.read_pickle(inputs['score'])).to_csv(output, index=False)
+
+
+def plot_stage(inputs, output):
+    """The report train_model.py --report draws, rendered to a PNG without a display"""
+    shot_data = pd.read_pickle(inputs['score'])
+    _, _, (_, X_test, _, y_test) = _split(shot_data)
+    compiled_model = load_model(inputs['train'])
+    render_report(report_data(shot_data['shooting_ability_score'], shot_data['is_goal'], y_test,
+                              compiled_model.predict(X_test), FEATURES,
+                              compiled_model.rf_model.feature_importances_), output, format='png')
+
+
+# The stage graph, in dependency order. 'inputs' are upstream stages (or the
+# events.csv source), 'code' the modules the stage function uses directly
+# (pipeline itself holds the stage functions, so editing any of them reruns);
+# their source, and that of every local module they import, is part of the
+# cache key. 'output' the file (or directory) suffix, 'publish' where the result is
+# copied after a run and 'requires' an optional package the stage needs (the
+# stage is left out of the default run when it is not installed).
+STAGES = {
+    'load': {'run': load_stage, 'inputs': ['events'], 'code': ['pipeline', 'data_loader'], 'output': '.pkl'},
+    'score': {'run': score_stage, 'inputs': ['load'], 'code': ['pipeline', 'scoring'], 'output': '.pkl'},
+    'train': {'run': train_stage, 'inputs': ['score'], 'code': ['pipeline', 'scoring', 'model', 'model_store'],
+              'params': {'rf': RF_PARAMS, 'test_size': TEST_SIZE, 'seed': SPLIT_SEED},
+              'output': '', 'publish': DEFAULT_MODEL_DIR},
+    'ratings': {'run': ratings_stage, 'inputs': ['score'], 'code': ['pipeline', 'ratings'], 'output': '.csv',
+                'publish': 'player_shooting_ratings.csv'},
+    'evaluate': {'run': evaluate_stage, 'inputs': ['score', 'train'],
+                 'code': ['pipeline', 'scoring', 'model', 'model_store'],
+                 'params': {'test_size': TEST_SIZE, 'seed': SPLIT_SEED}, 'output': '.json',
+                 'publish': 'model_metrics.json'},
+    'plot': {'run': plot_stage, 'inputs': ['score', 'train'],
+             'code': ['pipeline', 'scoring', 'model', 'model_store', 'reports'],
+             'params': {'test_size': TEST_SIZE, 'seed': SPLIT_SEED}, 'output': '.png',
+             'publish': 'shooting_analysis.png', 'requires': 'matplotlib'}
+}
+
+
+# JSON fields left out of output digests: a model saved again from the same
+# data differs only in its timestamp, which must not rerun evaluate and plot
+UNDIGESTED_FIELDS = {'metadata.json': ['created']}
+
+
+def path_digest(path):
+    """SHA-256 of a file, or of every file in a directory (names included, UNDIGESTED_FIELDS left out)"""
+    digest = hashlib.sha256()
+    paths = [path] if os.path.isfile(path) else sorted(
+        os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    for file_path in paths:
+        digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+        skipped = UNDIGESTED_FIELDS.get(os.path.basename(file_path))
+        if skipped:
+            with open(file_path, encoding='utf-8') as f:
+                content = {key: value for key, value in json.load(f).items() if key not in skipped}
+            digest.update(json.dumps(content, sort_keys=True).encode('utf-8'))
+            continue
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def local_imports(module):
+    """The modules in SOURCE_DIR that `module` imports (at the top or inside functions)"""
+    with open(os.path.join(SOURCE_DIR, module + '.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    return {name for name in names if os.path.isfile(os.path.join(SOURCE_DIR, name + '.py'))}
+
+
+def code_modules(name):
+    """
+    A stage's code modules and everything they import from SOURCE_DIR. pipeline's
+    own imports are not followed: they serve every stage, and each stage lists
+    the ones its function uses.
+    """
+    modules = set()
+    todo = list(STAGES[name]['code'])
+    while todo:
+        module = todo.pop()
+        if module not in modules:
+            modules.add(module)
+            if module != 'pipeline':
+                todo += local_imports(module)
+    return sorted(modules)
+
+
+def stage_key(name, input_digests):
+    """Hash of everything a stage's output depends on: its code, parameters and input contents"""
+    stage = STAGES[name]
+    key = {
+        'stage': name,
+        'code': {module: path_digest(os.path.join(SOURCE_DIR, module + '.py')) for module in code_modules(name)},
+        'params': stage.get('params'),
+        'inputs': {source: input_digests[source] for source in stage['inputs']}
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def default_targets():
+    """Every stage whose optional package is installed (like train_model.py, plotting is optional)"""
+    targets = []
+    for name, stage in STAGES.items():
+        if stage.get('requires') and importlib.util.find_spec(stage['requires']) is None:
+            print(f"⚠️ Skipping the '{name}' stage: {stage['requires']} is not installed")
+            continue
+        targets.append(name)
+    return targets
+
+
+def stages_for(targets):
+    """The targets and everything they depend on, in STAGES (dependency) order"""
+    needed = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name in STAGES and name not in needed:
+            needed.add(name)
+            todo += STAGES[name]['inputs']
+    return [name for name in STAGES if name in needed]
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def run_stage(name, inputs, output):
+    """
+    Run one stage in a worker process. The output is written under a temporary
+    name and renamed, so an interrupted stage never leaves a valid-looking output.
+    """
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    temp_output = output + '.tmp' + STAGES[name]['output']
+    _remove(temp_output)
+    STAGES[name]['run'](inputs, temp_output)
+    _remove(output)
+    os.replace(temp_output, output)
+    return time.perf_counter() - start, time.process_time() - cpu_start, os.getpid()
+
+
+def _load_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(cache_dir, manifest):
+    temp_path = os.path.join(cache_dir, 'manifest.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, os.path.join(cache_dir, 'manifest.json'))
+
+
+def run_pipeline(targets=None, events=None, cache_dir=DEFAULT_PIPELINE_DIR, workers=None, force=False):
+    """
+    Run the stages needed for `targets` (default: all that can run). A stage
+    is skipped when the manifest has an output for its key (code, parameters
+    and input contents) whose content hash still matches. Stages whose inputs
+    are ready run in parallel on a process pool. Returns {stage: report} in
+    stage order.
+    """
+    plan = stages_for(targets or default_targets())
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _load_manifest(cache_dir)
+
+    events = events_path(events)
+    digests = {'events': source_fingerprint(events)}
+    paths = {'events': events}
+    report = {}
+    pending = list(plan)
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            # Start (or skip) every stage whose inputs are all available
+            ready = [name for name in pending if all(source in digests for source in STAGES[name]['inputs'])]
+            while ready:
+                name = ready.pop(0)
+                pending.remove(name)
+                key = stage_key(name, digests)
+                output = os.path.abspath(os.path.join(cache_dir, f"{name}-{key[:16]}{STAGES[name]['output']}"))
+                inputs = {source: paths[source] for source in STAGES[name]['inputs']}
+
+                cached = manifest.get(name)
+                if (not force and cached and cached['key'] == key and os.path.exists(output)
+                        and path_digest(output) == cached['digest']):
+                    digests[name], paths[name] = cached['digest'], output
+                    report[name] = {'status': 'cached', 'seconds': 0.0, 'cpu_seconds': 0.0, 'pid': None}
+                    ready += [stage for stage in pending if stage not in ready and
+                              all(source in digests for source in STAGES[stage]['inputs'])]
+                    continue
+                running[pool.submit(run_stage, name, inputs, output)] = (name, key, output)
+
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, key, output = running.pop(future)
+                seconds, cpu_seconds, pid = future.result()
+
+                # Replace this stage's previous output, so the cache holds one output per stage
+                previous = manifest.get(name)
+                if previous and previous['output'] != output:
+                    _remove(previous['output'])
+                digests[name], paths[name] = path_digest(output), output
+                manifest[name] = {'key': key, 'output': output, 'digest': digests[name]}
+                _save_manifest(cache_dir, manifest)
+                report[name] = {'status': 'ran', 'seconds': seconds, 'cpu_seconds': cpu_seconds, 'pid': pid}
+
+    for name in plan:
+        report[name]['output'] = paths[name]
+    return {name: report[name] for name in plan}
+
+
+def publish(report):
+    """Copy the stage outputs to where train_model.py writes them (only those that changed)"""
+    published = []
+    for name, result in report.items():
+        target = STAGES[name].get('publish')
+        if target is None:
+            continue
+        if os.path.exists(target) and path_digest(target) == path_digest(result['output']):
+            continue
+        _remove(target)
+        if os.path.isdir(result['output']):
+            shutil.copytree(result['output'], target)
+        else:
+            shutil.copyfile(result['output'], target)
+        published.append(target)
+    return published
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the training pipeline as cached, parallel stages')
+    parser.add_argument('targets', nargs='*',
+                        help=f"stages to bring up to date, with their dependencies: {', '.join(STAGES)} "
+                             f"(default: all; plot only when matplotlib is installed)")
+    parser.add_argument('--events', help='path to events.csv (default: $EVENTS_CSV)')
+    parser.add_argument('--cache-dir', default=DEFAULT_PIPELINE_DIR, help='stage output cache')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--force', action='store_true', help='rerun every stage even if its output is cached')
+    args = parser.parse_args()
+    unknown = [name for name in args.targets if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    report = run_pipeline(args.targets, args.events, args.cache_dir, args.workers, args.force)
+    elapsed = time.perf_counter() - start
+    published = publish(report)
+
+    print(f"{'Stage':10} {'Status':8} {'Wall s':>8} {'CPU s':>8} {'Worker':>8}")
+    for name, result in report.items():
+        print(f"{name:10} {result['status']:8} {result['seconds']:8.2f} {result['cpu_seconds']:8.2f} "
+              f"{result['pid'] or '-':>8}")
+    stage_total = sum(result['seconds'] for result in report.values())
+    print(f"\nTotal {elapsed:.2f} s wall for {stage_total:.2f} s of stage work "
+          f"({sum(result['status'] == 'cached' for result in report.values())} of {len(report)} stages cached)")
+    for target in published:
+        print(f"✅ Updated '{target}'")
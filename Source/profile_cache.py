@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_PROFILE_CACHE_SIZE = 256
+
+
+class ProfileCache:
+    """
+    Bounded LRU cache of computed player profiles, keyed by (player, data version).
+
+    Each player's data version starts at 0 and is bumped by invalidate(), so a
+    profile computed before new shots were ingested can never be served again;
+    its entry is dropped at the same time. Every invalidate() also starts a new
+    data generation: a profile computed from tables of an older generation is
+    returned but never stored, even if it was computed after the invalidation.
+    Hits, misses, evictions (entries pushed out by the size bound) and
+    invalidations are counted.
+    """
+
+    def __init__(self, maxsize=DEFAULT_PROFILE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._versions = {}
+        self.generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def version(self, player):
+        return self._versions.get(player, 0)
+
+    def get(self, player, compute, generation=None):
+        """
+        Cached profile of `player`, calling compute() to build it on a miss.
+        `generation` is the data generation compute() reads from (default: the
+        current one when the lookup is made).
+        """
+        with self._lock:
+            key = (player, self.version(player))
+            if generation is None:
+                generation = self.generation
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Computed outside the lock; a concurrent miss for the same player computes it twice
+        value = compute()
+
+        with self._lock:
+            # Only store it if it was computed from current data and the player
+            # was not invalidated meanwhile
+            if generation == self.generation and key[1] == self.version(player):
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, players):
+        """Bump the data version of `players`, drop their cached profiles and return the new generation"""
+        with self._lock:
+            self.generation += 1
+            for player in players:
+                version = self.version(player)
+                self._versions[player] = version + 1
+                if self._entries.pop((player, version), None) is not None:
+                    self.invalidations += 1
+            return self.generation
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'generation': self.generation,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
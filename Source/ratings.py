@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+MIN_SHOTS_FOR_RATING = 3  # Minimum 3 shots for rating
+
+RATING_COLUMNS = ['Player', 'Overall_Shooting_Rating', 'Total_Shots', 'Goals', 'Goal_Rate_%',
+                  'Avg_Shot_Quality', 'Shot_Consistency', 'Best_Shot', 'Worst_Shot']
+
+
+def overall_rating(avg_ability, std_ability, shot_count, goal_rate):
+    """
+    Overall shooting rating from a player's shot summary.
+    Works on scalars or on whole columns (one value per player).
+    """
+    # Consistency factor (lower std deviation = more consistent = bonus)
+    consistency_bonus = np.maximum(0, 10 - std_ability / 2)  # Up to 10 points for consistency
+
+    # Volume factor (more shots = more reliable rating)
+    volume_factor = np.minimum(1.0, shot_count / 20)  # Full weight at 20+ shots
+
+    # Goal conversion bonus
+    conversion_bonus = goal_rate * 15  # Up to 15 points for high conversion
+
+    # Base rating from average shooting ability score
+    overall = (avg_ability + consistency_bonus + conversion_bonus) * volume_factor
+
+    return np.minimum(overall, 100)  # Cap at 100
+
+
+def calculate_overall_player_rating(player_data):
+    """
+    Calculate overall shooting rating for a player based on their shot history
+    """
+    if len(player_data) == 0:
+        return 0
+
+    return overall_rating(player_data['shooting_ability_score'].mean(),
+                          player_data['shooting_ability_score'].std(),
+                          len(player_data),
+                          player_data['is_goal'].mean())
+
+
+def summarize_players(shot_data):
+    """
+    Per-player shot statistics in a single grouped pass.
+    Players keep their order of first appearance; shots without a player are dropped.
+    """
+    return shot_data.groupby('player', sort=False, observed=True).agg(
+        shots=('shooting_ability_score', 'count'),
+        avg=('shooting_ability_score', 'mean'),
+        std=('shooting_ability_score', 'std'),
+        best=('shooting_ability_score', 'max'),
+        worst=('shooting_ability_score', 'min'),
+        goals=('is_goal', 'sum'),
+        goal_rate=('is_goal', 'mean')
+    )
+
+
+def player_accumulators(shot_data):
+    """
+    Mergeable per-player sufficient statistics (count, sum, sum of squares,
+    best, worst, goals) for a batch of scored shots
+    """
+    scores = shot_data['shooting_ability_score']
+    return shot_data.assign(score_sq=scores * scores).groupby('player', sort=False, observed=True).agg(
+        shots=('shooting_ability_score', 'count'),
+        score_sum=('shooting_ability_score', 'sum'),
+        score_sumsq=('score_sq', 'sum'),
+        best=('shooting_ability_score', 'max'),
+        worst=('shooting_ability_score', 'min'),
+        goals=('is_goal', 'sum')
+    )
+
+
+def merge_accumulators(*parts):
+    """Fold several player_accumulators results into one (first-appearance order is kept)"""
+    combined = pd.concat(parts)
+    combined.index = combined.index.astype(object)
+    return combined.groupby(level=0, sort=False).agg({
+        'shots': 'sum',
+        'score_sum': 'sum',
+        'score_sumsq': 'sum',
+        'best': 'max',
+        'worst': 'min',
+        'goals': 'sum'
+    })
+
+
+def update_accumulators(accumulators, partial):
+    """
+    Add a batch of new statistics to existing accumulators, touching only the
+    rows of players in the batch (new players are appended in order)
+    """
+    partial = partial.copy()
+    partial.index = partial.index.astype(object)
+    known = partial.index.isin(accumulators.index)
+    existing = partial.index[known]
+
+    for column in ['shots', 'score_sum', 'score_sumsq', 'goals']:
+        accumulators.loc[existing, column] += partial.loc[existing, column]
+    accumulators.loc[existing, 'best'] = np.maximum(accumulators.loc[existing, 'best'], partial.loc[existing, 'best'])
+    accumulators.loc[existing, 'worst'] = np.minimum(accumulators.loc[existing, 'worst'], partial.loc[existing, 'worst'])
+
+    if known.all():
+        return accumulators
+    return pd.concat([accumulators, partial[~known]])
+
+
+def summary_from_accumulators(accumulators):
+    """
+    Convert accumulated statistics into the summarize_players layout.
+    Scores are whole numbers, so sum and sum of squares stay exact and the
+    variance numerator n*sumsq - sum^2 has no cancellation error.
+    """
+    shots = accumulators['shots']
+    score_sum = accumulators['score_sum']
+    variance = (shots * accumulators['score_sumsq'] - score_sum ** 2) / (shots * (shots - 1))
+    return pd.DataFrame({
+        'shots': shots,
+        'avg': score_sum / shots,
+        'std': np.sqrt(variance.clip(lower=0)),
+        'best': accumulators['best'],
+        'worst': accumulators['worst'],
+        'goals': accumulators['goals'],
+        'goal_rate': accumulators['goals'] / shots
+    })
+
+
+def ratings_from_summary(summary, min_shots=MIN_SHOTS_FOR_RATING):
+    """
+    Turn a per-player summary (see summarize_players) into the
+    player_shooting_ratings table, sorted by overall rating
+    """
+    summary = summary[summary['shots'] >= min_shots]
+    rating = overall_rating(summary['avg'], summary['std'], summary['shots'], summary['goal_rate'])
+
+    ratings_df = pd.DataFrame({
+        'Player': summary.index.astype(object),
+        'Overall_Shooting_Rating': rating.round(1).to_numpy(),
+        'Total_Shots': summary['shots'].to_numpy(dtype=np.int64),
+        'Goals': summary['goals'].to_numpy(dtype=np.int64),
+        'Goal_Rate_%': (summary['goal_rate'] * 100).round(1).to_numpy(),
+        'Avg_Shot_Quality': summary['avg'].round(1).to_numpy(),
+        'Shot_Consistency': summary['std'].round(1).to_numpy(),
+        'Best_Shot': summary['best'].round(1).to_numpy(),
+        'Worst_Shot': summary['worst'].round(1).to_numpy()
+    }, columns=RATING_COLUMNS)
+
+    return ratings_df.sort_values('Overall_Shooting_Rating', ascending=False)
+
+
+def calculate_player_ratings(shot_data, min_shots=MIN_SHOTS_FOR_RATING):
+    """Overall shooting ratings for every player with at least min_shots shots"""
+    return ratings_from_summary(summarize_players(shot_data), min_shots)
@@ -0,0 +1,135 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+# Scatters with more points than this are drawn as density plots (hexbin /
+# 2D histogram), which cost the same whatever the number of shots
+SCATTER_MAX_POINTS = 5000
+DENSITY_GRIDSIZE = 50
+REPORT_FORMATS = ('png', 'svg')
+DEFAULT_REPORT_PATH = 'shooting_analysis.png'
+
+
+def report_data(scores, is_goal, y_test, y_pred, features, importances):
+    """The arrays the report plots, in compact dtypes (what is handed to the render process)"""
+    return {
+        'scores': np.asarray(scores, dtype=np.float32),
+        'is_goal': np.asarray(is_goal, dtype=np.uint8),
+        'y_test': np.asarray(y_test, dtype=np.float32),
+        'y_pred': np.asarray(y_pred, dtype=np.float32),
+        'features': np.asarray(features, dtype=str),
+        'importances': np.asarray(importances, dtype=np.float64)
+    }
+
+
+def _density(plt, x, y, binary=False):
+    """Scatter small samples; bin large ones by count (log colour scale)"""
+    if len(x) <= SCATTER_MAX_POINTS:
+        plt.scatter(x, y, alpha=0.5)
+        return
+    from matplotlib.colors import LogNorm
+
+    if binary:
+        # One band of score bins for misses (0) and one for goals (1)
+        plt.hist2d(x, y, bins=[DENSITY_GRIDSIZE, 2], range=[[0, 100], [-0.5, 1.5]], cmin=1,
+                   norm=LogNorm(), cmap='Blues')
+        plt.yticks([0, 1])
+    else:
+        plt.hexbin(x, y, gridsize=DENSITY_GRIDSIZE, bins='log', mincnt=1, cmap='Blues')
+    plt.colorbar(label='Shots')
+
+
+def draw_report(data, plt):
+    """The four analysis panels of train_model.py, on a new figure"""
+    figure = plt.figure(figsize=(12, 8))
+    plt.subplot(2, 2, 1)
+    plt.hist(data['scores'], bins=20, alpha=0.7, color='skyblue')
+    plt.title('Distribution of Shooting Ability Scores')
+    plt.xlabel('Shooting Ability Score')
+    plt.ylabel('Frequency')
+
+    plt.subplot(2, 2, 2)
+    _density(plt, data['scores'], data['is_goal'], binary=True)
+    plt.title('Shooting Ability vs Goals')
+    plt.xlabel('Shooting Ability Score')
+    plt.ylabel('Goal (1) or No Goal (0)')
+
+    plt.subplot(2, 2, 3)
+    order = np.argsort(-data['importances'], kind='stable')
+    plt.bar(data['features'][order], data['importances'][order])
+    plt.title('Feature Importance in Shooting Ability Model')
+    plt.xticks(rotation=45)
+
+    plt.subplot(2, 2, 4)
+    y_test, y_pred = data['y_test'], data['y_pred']
+    _density(plt, y_test, y_pred)
+    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'r--', lw=2)
+    plt.title('Predicted vs Actual Shooting Ability')
+    plt.xlabel('Actual Score')
+    plt.ylabel('Predicted Score')
+
+    plt.tight_layout()
+    return figure
+
+
+def render_report(data, paths, format=None):
+    """
+    Save the report to each path (PNG or SVG by extension, or `format`) with
+    the Agg backend, so no display is needed. matplotlib is imported here, only
+    when a report is actually drawn.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    figure = draw_report(data, plt)
+    for path in [paths] if isinstance(paths, str) else paths:
+        figure.savefig(path, format=format or report_format(path), dpi=100)
+    plt.close(figure)
+
+
+def show_report(data):
+    """Draw the report in an interactive window (blocks until it is closed)"""
+    import matplotlib.pyplot as plt
+
+    draw_report(data, plt)
+    plt.show()
+
+
+def report_format(path):
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    if extension not in REPORT_FORMATS:
+        raise ValueError(f"Report '{path}' must end in one of: {', '.join('.' + f for f in REPORT_FORMATS)}")
+    return extension
+
+
+def start_report(data, paths):
+    """
+    Render the report in a background process and return it (wait() on it
+    before exiting). The data goes through a temporary .npz file, and the
+    process runs this module as a script, so the caller's own module is never
+    re-imported and matplotlib is never loaded into the caller.
+    """
+    for path in paths:
+        report_format(path)
+    handle, data_path = tempfile.mkstemp(suffix='.npz')
+    with os.fdopen(handle, 'wb') as f:
+        np.savez(f, **data)
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), data_path, *paths])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render the shooting analysis report from saved plot data')
+    parser.add_argument('data', help='.npz written by start_report (deleted once read)')
+    parser.add_argument('paths', nargs='+', help='PNG / SVG files to write')
+    args = parser.parse_args()
+
+    with np.load(args.data) as saved:
+        data = {name: saved[name] for name in saved.files}
+    os.remove(args.data)
+    render_report(data, args.paths)
+    print(f"✅ Report saved to {', '.join(repr(path) for path in args.paths)}")
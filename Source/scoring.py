@@ -0,0 +1,146 @@
+import hashlib
+import json
+
+import numpy as np
+
+# Shot quality factors used for scoring and as model features
+FEATURES = ['shot_place', 'shot_outcome', 'location', 'bodypart', 'assist_method', 'situation']
+
+# Points awarded for each event code (see dictionary.txt for code meanings)
+SCORING_RULES = {
+    # Shot placement scoring (40 points max)
+    'shot_place': {
+        3: 40,   # Bottom left corner - excellent
+        4: 40,   # Bottom right corner - excellent
+        5: 35,   # Centre of the goal - very good
+        11: 38,  # Top centre of the goal - very good
+        12: 40,  # Top left corner - excellent
+        13: 40,  # Top right corner - excellent
+        7: 25,   # Hits the bar - good attempt
+        1: 15,   # Bit too high - poor
+        2: 10,   # Blocked - poor
+        6: 5,    # High and wide - very poor
+        8: 8,    # Misses to the left - very poor
+        9: 8,    # Misses to the right - very poor
+        10: 5    # Too high - very poor
+    },
+    # Shot outcome scoring (25 points max)
+    'shot_outcome': {
+        1: 25,   # On target - excellent
+        4: 20,   # Hit the bar - good
+        2: 5,    # Off target - poor
+        3: 10    # Blocked - below average
+    },
+    # Location scoring (20 points max)
+    'location': {
+        3: 20,   # Centre of the box - excellent position
+        13: 20,  # Very close range - excellent
+        14: 18,  # Penalty spot - very good
+        9: 15,   # Left side of the box - good
+        11: 15,  # Right side of the box - good
+        10: 15,  # Left side of six yard box - good
+        12: 15,  # Right side of six yard box - good
+        15: 10,  # Outside the box - average
+        16: 8,   # Long range - below average
+        6: 5,    # Difficult angle and long range - poor
+        7: 6,    # Difficult angle on the left - poor
+        8: 6,    # Difficult angle on the right - poor
+        17: 3,   # More than 35 yards - very poor
+        18: 2,   # More than 40 yards - very poor
+        1: 8,    # Attacking half - average
+        4: 7,    # Left wing - below average
+        5: 7     # Right wing - below average
+    },
+    # Body part scoring (8 points max)
+    'bodypart': {
+        1: 8,    # Right foot - good technique
+        2: 8,    # Left foot - good technique
+        3: 6     # Head - slightly lower technique
+    },
+    # Assist method bonus (4 points max)
+    'assist_method': {
+        0: 2,    # None - individual skill
+        1: 4,    # Pass - good setup
+        2: 3,    # Cross - decent setup
+        3: 3,    # Headed pass - decent setup
+        4: 4     # Through ball - excellent setup
+    },
+    # Situation bonus (3 points max)
+    'situation': {
+        1: 3,    # Open play - good
+        2: 2,    # Set piece - average
+        3: 2,    # Corner - average
+        4: 2     # Free kick - average
+    }
+}
+
+MAX_SCORE = 100
+
+# Content hash of the rules; changes whenever any points value changes, so
+# artifacts built from older rules can be detected (see model_store.py)
+RULES_VERSION = hashlib.sha256(json.dumps(
+    {'rules': {feature: sorted(SCORING_RULES[feature].items()) for feature in FEATURES},
+     'max_score': MAX_SCORE},
+    sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def create_shooting_ability_target(row):
+    """
+    Create target shooting ability score (0-100) based on shot quality factors
+    (row-wise reference implementation, one Python call per event)
+    """
+    if row['event_type'] != 1:  # Only for shot attempts
+        return np.nan
+
+    score = 0
+    for feature in FEATURES:
+        score += SCORING_RULES[feature].get(row[feature], 0)
+
+    return min(score, MAX_SCORE)  # Cap at 100
+
+
+def build_lookup_tables():
+    """
+    Expand each factor's rules into a dense array indexed by event code.
+    The last slot of every table is a 0-point sentinel for missing or unknown codes.
+    """
+    tables = {}
+    for feature in FEATURES:
+        rules = SCORING_RULES[feature]
+        table = np.zeros(max(rules) + 2, dtype=np.int64)
+        for code, points in rules.items():
+            table[code] = points
+        tables[feature] = table
+    return tables
+
+
+LOOKUP_TABLES = build_lookup_tables()
+
+
+def _lookup(table, column):
+    """Map a column of event codes to points, sending NaN/unknown codes to the sentinel"""
+    codes = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    sentinel = len(table) - 1
+    valid = (codes >= 0) & (codes < sentinel) & (codes == np.floor(codes))
+    index = np.where(valid, codes, sentinel).astype(np.intp)
+    return table[index]
+
+
+def score_shots(shots):
+    """
+    Vectorized shooting ability score (0-100) for a frame of shot attempts.
+    Gives exactly the same values as create_shooting_ability_target.
+    """
+    score = np.zeros(len(shots), dtype=np.int64)
+    for feature in FEATURES:
+        score += _lookup(LOOKUP_TABLES[feature], shots[feature])
+    return np.minimum(score, MAX_SCORE).astype(np.float64)
+
+
+def score_shot_attempts(df):
+    """
+    Keep only shot attempts (event_type == 1) and add their shooting_ability_score
+    """
+    shot_data = df[df['event_type'] == 1].copy()
+    shot_data['shooting_ability_score'] = score_shots(shot_data)
+    return shot_data
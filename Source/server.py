@@ -0,0 +1,371 @@
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from data_loader import EVENT_COLUMNS, EVENT_DTYPES, add_match_info, load_events, load_matches
+from form import FORM_COLUMNS, add_form
+from incremental import empty_state, ingest_events
+from leaderboard import Leaderboard
+from profile_cache import DEFAULT_PROFILE_CACHE_SIZE, ProfileCache
+from ratings import MIN_SHOTS_FOR_RATING, ratings_from_summary, summary_from_accumulators
+from scoring import score_shot_attempts
+from web_payload import lowercase_name_index
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Smaller responses are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+# Fields of each shot in a player's shot history
+SHOT_HISTORY_COLUMNS = ['id_odsp', 'date', 'time', 'opponent', 'is_goal', 'shooting_ability_score'] + FORM_COLUMNS
+# Most recent shots included in a profile (the rest are paged through /players/<name>/shots)
+PROFILE_HISTORY_SHOTS = 50
+
+
+class QueryError(Exception):
+    """A request that cannot be answered, with the HTTP status to answer it with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryTables:
+    """
+    Ratings and scored shots indexed for the service:
+      - players in rating order, with a lowercase name -> position map
+      - a Leaderboard over them for filtered top-N queries (team, opponent,
+        league, minimum shots, rating band)
+      - every rated player's shots in career order, stored contiguously
+        with per-player offsets
+    """
+
+    def __init__(self, shot_data, ratings, generation=0):
+        # The profile cache generation these tables belong to (see ProfileCache)
+        self.generation = generation
+        ratings = ratings.reset_index(drop=True)
+        self.players = ratings.to_dict('records')
+        self.player_ids = lowercase_name_index(ratings['Player'])
+        self.leaderboard = Leaderboard(ratings, shot_data)
+
+        # Career order within each player (add_form), then players in rating order
+        positions = pd.Series(np.arange(len(ratings)), index=ratings['Player'])
+        shots = add_form(shot_data[shot_data['player'].astype(object).isin(positions.index)])
+        player_positions = positions.reindex(shots['player'].astype(object)).to_numpy()
+        order = np.argsort(player_positions, kind='stable')
+        shots = shots.iloc[order]
+        counts = np.bincount(player_positions[order], minlength=len(ratings))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        history = shots[SHOT_HISTORY_COLUMNS].copy()
+        history['id_odsp'] = history['id_odsp'].astype(str)
+        history['date'] = history['date'].dt.strftime('%Y-%m-%d')
+        history = history.astype(object).where(history.notna(), None)
+        self.shots = history.to_dict('records')
+
+    def find_player(self, name):
+        position = self.player_ids.get(name.lower())
+        if position is None:
+            raise QueryError(404, f"Player '{name}' not found")
+        return position
+
+    def current_form(self, position):
+        start, end = self.offsets[position], self.offsets[position + 1]
+        latest = self.shots[end - 1] if end > start else {}
+        return {column: latest.get(column) for column in FORM_COLUMNS}
+
+    def profile(self, position):
+        """
+        Everything a profile view shows: the stats cards, chart series (with the
+        average line and date range) and the most recent shots
+        """
+        player = self.players[position]
+        shots = self.shots[self.offsets[position]:self.offsets[position + 1]]
+        dated = [shot for shot in shots if shot['date'] is not None]
+        scores = [shot['shooting_ability_score'] for shot in shots]
+        return {
+            'stats': {**player, 'Range': round(player['Best_Shot'] - player['Worst_Shot'], 1)},
+            'form': self.current_form(position),
+            'chart': {
+                'dates': [shot['date'] for shot in dated],
+                'minutes': [shot['time'] for shot in dated],
+                'scores': [shot['shooting_ability_score'] for shot in dated],
+                'goals': [shot['is_goal'] for shot in dated],
+                **{column: [shot[column] for shot in dated] for column in FORM_COLUMNS},
+                'average': sum(scores) / len(scores) if scores else None,
+                'date_range': [dated[0]['date'], dated[-1]['date']] if dated else None
+            },
+            'history': {
+                'total': len(shots),
+                'items': shots[::-1][:PROFILE_HISTORY_SHOTS]
+            }
+        }
+
+    def shot_rows(self, name):
+        """Row range of a player's shots in self.shots (career order)"""
+        position = self.find_player(name)
+        return self.offsets[position], self.offsets[position + 1]
+
+
+class QueryIndex:
+    """
+    The service's data: an incremental rating state (see incremental.py), the
+    scored shots, the QueryTables built from them and an LRU cache of player
+    profiles. ingest() adds the events of new matches, rebuilds the tables and
+    invalidates the cached profiles of exactly the players it touched.
+    """
+
+    def __init__(self, events, matches, min_shots=MIN_SHOTS_FOR_RATING, cache_size=DEFAULT_PROFILE_CACHE_SIZE):
+        self.matches = matches
+        self.min_shots = min_shots
+        self.state = empty_state()
+        ingest_events(self.state, events)
+        self.shot_data = add_match_info(score_shot_attempts(events), matches)
+        self.profiles = ProfileCache(cache_size)
+        self._ingest_lock = threading.Lock()
+        self.tables = self._build_tables()
+
+    def _build_tables(self, generation=0):
+        ratings = ratings_from_summary(summary_from_accumulators(self.state['players']), self.min_shots)
+        return QueryTables(self.shot_data, ratings, generation)
+
+    def ingest(self, events):
+        """
+        Add the events of matches not seen before (re-sent matches are ignored).
+        Returns the number of new matches and the players whose shots changed.
+        """
+        with self._ingest_lock:
+            known_matches = set(self.state['matches'])
+            affected = ingest_events(self.state, events, known_matches)
+            if len(affected):
+                new_events = events[~events['id_odsp'].astype(object).isin(known_matches)]
+                new_shots = add_match_info(score_shot_attempts(new_events), self.matches)
+                self.shot_data = pd.concat([self.shot_data, new_shots], ignore_index=True)
+                # Requests keep using the old tables until the new ones are swapped in.
+                # Invalidating first starts a new generation, so profiles still being
+                # computed from the old tables are not cached, and nothing cached for
+                # the affected players is served with the new tables
+                tables = self._build_tables()
+                tables.generation = self.profiles.invalidate(affected)
+                self.tables = tables
+            return len(self.state['matches']) - len(known_matches), list(affected)
+
+    def profile(self, name):
+        """A player's cached profile, plus their current rank (which other players' shots can change)"""
+        tables = self.tables
+        position = tables.find_player(name)
+        player = tables.players[position]['Player']
+        profile = self.profiles.get(player, lambda: tables.profile(position), tables.generation)
+        return {**profile, 'rank': position + 1}
+
+    def player(self, name):
+        """A player's ratings, overall rank and current form"""
+        tables = self.tables
+        position = tables.find_player(name)
+        return {**tables.players[position], 'rank': position + 1, 'form': tables.current_form(position)}
+
+    def summary(self):
+        tables = self.tables
+        return {
+            'players': len(tables.players),
+            'shots': len(tables.shots),
+            'matches': len(self.state['matches']),
+            'teams': tables.leaderboard.keys('team'),
+            'leagues': tables.leaderboard.keys('league'),
+            'endpoints': ['/players/<name>', '/players/<name>/profile',
+                          '/players/<name>/shots?offset=&limit=&order=asc|desc',
+                          '/top?team=&opponent=&league=&min_shots=&min_rating=&max_rating=&offset=&limit=', '/cache',
+                          'POST /ingest (events CSV body)']
+        }
+
+
+def load_query_index(events_path=None, matches_path=None, cache_size=DEFAULT_PROFILE_CACHE_SIZE):
+    return QueryIndex(load_events(events_path), load_matches(matches_path), cache_size=cache_size)
+
+
+def _int_param(params, name, default, low=0, high=None):
+    if name not in params:
+        return default
+    try:
+        value = int(params[name][-1])
+    except ValueError:
+        raise QueryError(400, f"'{name}' must be an integer")
+    if value < low or (high is not None and value > high):
+        raise QueryError(400, f"'{name}' must be between {low} and {high if high is not None else 'any'}")
+    return value
+
+
+def _float_param(params, name, default):
+    if name not in params:
+        return default
+    try:
+        return float(params[name][-1])
+    except ValueError:
+        raise QueryError(400, f"'{name}' must be a number")
+
+
+def _page(items_count, params):
+    offset = _int_param(params, 'offset', 0)
+    limit = _int_param(params, 'limit', DEFAULT_PAGE_SIZE, low=1, high=MAX_PAGE_SIZE)
+    end = max(offset, min(items_count, offset + limit))
+    return offset, limit, end, {
+        'total': int(items_count),
+        'offset': offset,
+        'limit': limit,
+        'next_offset': end if end < items_count else None
+    }
+
+
+def answer(index, path, params):
+    """Route a GET request to the index and return the JSON-ready response"""
+    parts = [unquote(part) for part in path.strip('/').split('/')] if path.strip('/') else []
+
+    if not parts:
+        return index.summary()
+
+    if parts == ['cache']:
+        return index.profiles.stats()
+
+    if parts[0] == 'players' and len(parts) == 2:
+        return index.player(parts[1])
+
+    if parts[0] == 'players' and len(parts) == 3 and parts[2] == 'profile':
+        return index.profile(parts[1])
+
+    tables = index.tables
+    if parts[0] == 'players' and len(parts) == 3 and parts[2] == 'shots':
+        start, end = tables.shot_rows(parts[1])
+        order = params.get('order', ['asc'])[-1]
+        if order not in ('asc', 'desc'):
+            raise QueryError(400, "'order' must be asc or desc")
+        offset, limit, page_end, page = _page(end - start, params)
+        if order == 'asc':
+            items = tables.shots[start + offset:start + page_end]
+        else:
+            items = tables.shots[end - page_end:end - offset][::-1]
+        return {**page, 'order': order, 'items': items}
+
+    if parts == ['top']:
+        filters = {name: params[name][-1] for name in ('team', 'opponent', 'league') if name in params}
+        filters['min_shots'] = _int_param(params, 'min_shots', None)
+        if 'min_rating' in params or 'max_rating' in params:
+            filters['rating_band'] = (_float_param(params, 'min_rating', -np.inf),
+                                      _float_param(params, 'max_rating', np.inf))
+        offset, limit, page_end, page = _page(tables.leaderboard.count(**filters), params)
+        items = [{**tables.players[position], 'rank': int(position) + 1}
+                 for position in tables.leaderboard.top(limit, offset, **filters)]
+        return {**page, 'items': items}
+
+    raise QueryError(404, f"Unknown endpoint '{path}'")
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """JSON over HTTP/1.1 (keep-alive) with gzip and ETag revalidation"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; without TCP_NODELAY the body of a
+    # keep-alive response waits ~40 ms for the client's delayed ACK
+    disable_nagle_algorithm = True
+    index = None
+    verbose = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            status, payload = 200, answer(self.index, url.path, parse_qs(url.query))
+        except QueryError as error:
+            status, payload = error.status, {'error': str(error)}
+        self._respond(status, payload)
+
+    def do_POST(self):
+        """POST /ingest with an events CSV body (same columns as events.csv)"""
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if urlsplit(self.path).path.rstrip('/') != '/ingest':
+            self._respond(404, {'error': f"Unknown endpoint '{self.path}'"})
+            return
+        try:
+            events = pd.read_csv(io.BytesIO(body), usecols=EVENT_COLUMNS, dtype=EVENT_DTYPES)[EVENT_COLUMNS]
+        except ValueError as error:
+            self._respond(400, {'error': f"Could not read events CSV: {error}"})
+            return
+
+        start = time.perf_counter()
+        new_matches, affected = self.index.ingest(events)
+        self._respond(200, {'new_matches': new_matches, 'affected_players': len(affected),
+                            'seconds': round(time.perf_counter() - start, 3)})
+
+    def _respond(self, status, payload):
+        body = json.dumps(payload, separators=(',', ':'), default=_json_default).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        if status == 200 and self.command == 'GET' and etag in self._if_none_match():
+            self._send(304, b'', {'ETag': etag})
+            return
+
+        headers = {'Content-Type': 'application/json; charset=utf-8', 'ETag': etag,
+                   'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if len(body) >= GZIP_MIN_BYTES and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        self._send(status, body, headers)
+
+    def _if_none_match(self):
+        header = self.headers.get('If-None-Match', '')
+        return {tag.strip().removeprefix('W/') for tag in header.split(',') if tag.strip()}
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+def serve(index, host='127.0.0.1', port=8000, verbose=False):
+    handler = type('Handler', (QueryHandler,), {'index': index, 'verbose': verbose})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local JSON query service for player ratings and shots')
+    parser.add_argument('--events', help='path to events.csv (default: $EVENTS_CSV)')
+    parser.add_argument('--matches', help='path to ginf.csv (default: $GINF_CSV)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_PROFILE_CACHE_SIZE,
+                        help='player profiles kept in the LRU cache')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    query_index = load_query_index(args.events, args.matches, args.cache_size)
+    print(f"Indexed {len(query_index.tables.players)} players and {len(query_index.tables.shots)} shots "
+          f"in {time.perf_counter() - start:.2f} s")
+
+    server = serve(query_index, args.host, args.port, args.verbose)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/ (Ctrl+C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,69 @@
+import argparse
+import time
+
+import numpy as np
+
+from data_loader import DEFAULT_CHUNKSIZE, iter_events, load_events, peak_memory_mb
+from ratings import (MIN_SHOTS_FOR_RATING, merge_accumulators, player_accumulators,
+                     ratings_from_summary, summarize_players, summary_from_accumulators)
+from scoring import score_shot_attempts
+
+
+def stream_player_accumulators(path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Read events.csv chunk by chunk, score the shot attempts in each chunk and
+    fold them into per-player accumulators. Only one chunk plus one row per
+    player is ever held in memory.
+    """
+    accumulators = None
+    for chunk in iter_events(path, chunksize):
+        partial = player_accumulators(score_shot_attempts(chunk))
+        if accumulators is None:
+            accumulators = partial
+        else:
+            accumulators = merge_accumulators(accumulators, partial)
+    return accumulators
+
+
+def stream_player_ratings(path=None, chunksize=DEFAULT_CHUNKSIZE, min_shots=MIN_SHOTS_FOR_RATING):
+    """Overall player ratings computed without loading the whole event table"""
+    summary = summary_from_accumulators(stream_player_accumulators(path, chunksize))
+    return ratings_from_summary(summary, min_shots)
+
+
+def compare_with_in_memory(accumulators, path=None):
+    """Check streamed per-player statistics against the in-memory groupby (float tolerance)"""
+    streamed = summary_from_accumulators(accumulators)
+    in_memory = summarize_players(score_shot_attempts(load_events(path, verbose=False)))
+    in_memory.index = in_memory.index.astype(object)
+
+    if not streamed.index.equals(in_memory.index):
+        return False
+    return all(np.allclose(streamed[column], in_memory[column], rtol=1e-12, atol=1e-9, equal_nan=True)
+               for column in in_memory.columns)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compute player shooting ratings from events.csv in bounded memory')
+    parser.add_argument('--events', help='path to events.csv (default: $EVENTS_CSV)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='rows per chunk')
+    parser.add_argument('--output', default='player_shooting_ratings.csv', help='ratings CSV to write')
+    parser.add_argument('--verify', action='store_true',
+                        help='also load the full table and check the streamed statistics match')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    accumulators = stream_player_accumulators(args.events, args.chunksize)
+    overall_ratings_df = ratings_from_summary(summary_from_accumulators(accumulators))
+    elapsed = time.perf_counter() - start
+
+    overall_ratings_df.to_csv(args.output, index=False)
+    peak = peak_memory_mb()
+    peak_text = f"{peak:.0f} MB" if peak is not None else "n/a"
+    print(f"Rated {len(overall_ratings_df)} players in {elapsed:.2f} s "
+          f"(chunks of {args.chunksize} rows, peak memory {peak_text})")
+    print(f"✅ Player shooting ratings saved to '{args.output}'")
+
+    if args.verify:
+        matches = compare_with_in_memory(accumulators, args.events)
+        print(f"Matches in-memory ratings: {matches}")
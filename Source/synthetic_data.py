@@ -0,0 +1,267 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+DICTIONARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dictionary.txt')
+
+# 1x is the size of the Kaggle events.csv (941,009 events, about 9,000 matches)
+EVENTS_PER_SCALE = 941_009
+EVENTS_PER_MATCH = 104
+MATCHES_PER_CHUNK = 2000
+
+# Leagues of 20 teams with squads of 25, playing 380 matches a season
+TEAMS_PER_LEAGUE = 20
+SQUAD_SIZE = 25
+MATCHES_PER_SEASON = 380
+MAX_SEASONS = 6
+FIRST_SEASON = 2012
+
+# Approximate shares in the Kaggle events.csv (codes from dictionary.txt)
+EVENT_TYPE_WEIGHTS = {0: 0.5, 1: 24.4, 2: 9.4, 3: 24.8, 4: 4.2, 5: 0.15, 6: 0.12, 7: 5.5,
+                      8: 24.3, 9: 4.6, 10: 1.1, 11: 0.3}
+SHOT_OUTCOME_WEIGHTS = {1: 35, 2: 38, 3: 25, 4: 2}
+# Where the ball went, given the outcome: on target, off target, blocked, hit the bar
+SHOT_PLACE_WEIGHTS = {
+    1: {3: 20, 4: 20, 5: 35, 11: 5, 12: 10, 13: 10},
+    2: {1: 12, 6: 15, 8: 25, 9: 25, 10: 23},
+    3: {2: 1},
+    4: {7: 1}
+}
+# Share of on-target shots that are goals (about 10% of all shots)
+ON_TARGET_GOAL_RATE = 0.3
+LOCATION_WEIGHTS = {1: 1, 2: 0.3, 3: 33, 4: 0.3, 5: 0.3, 6: 2, 7: 2, 8: 2, 9: 6, 10: 1, 11: 6, 12: 1,
+                    13: 3, 14: 1, 15: 30, 16: 8, 17: 1, 18: 1, 19: 1}
+BODYPART_WEIGHTS = {1: 55, 2: 30, 3: 15}
+ASSIST_METHOD_WEIGHTS = {0: 25, 1: 45, 2: 20, 3: 5, 4: 5}
+SITUATION_WEIGHTS = {1: 78, 2: 7, 3: 11, 4: 4}
+# Shots whose factor is not recorded (empty in the CSV)
+SHOT_MISSING_RATES = {'shot_place': 0.1, 'shot_outcome': 0.005, 'location': 0.001, 'bodypart': 0.001,
+                      'situation': 0.001}
+MISSING_PLAYER_RATE = 0.03
+
+LEAGUES = ['E0', 'SP1', 'D1', 'I1', 'F1']
+COUNTRIES = {'E0': 'england', 'SP1': 'spain', 'D1': 'germany', 'I1': 'italy', 'F1': 'france'}
+FIRST_NAMES = ['mario', 'carlos', 'daniel', 'luis', 'thomas', 'james', 'kevin', 'andrea', 'pierre', 'sergio',
+               'marco', 'lucas', 'david', 'jesús', 'antoine', 'robert', 'jérôme', 'diego', 'miguel', 'ángel',
+               'paulo', 'olivier', 'karim', 'sami', 'josé', 'raúl', 'björn', 'stefan', 'nicolás', 'jordi']
+LAST_NAMES = ['gomez', 'vela', 'guiza', 'müller', 'suárez', 'silva', 'rossi', 'martin', 'garcía', 'dubois',
+              'schmidt', 'fernández', 'costa', 'bianchi', 'lópez', 'hernández', 'moreau', 'weber', 'ricci',
+              'sánchez', 'pérez', 'kane', 'walker', 'zapata', 'nuñez', 'lefèvre', 'krämer', 'romano', 'navas',
+              'ibáñez']
+
+# Columns of the Kaggle files (events.csv and ginf.csv), in file order
+EVENT_FILE_COLUMNS = ['id_odsp', 'id_event', 'sort_order', 'time', 'text', 'event_type', 'event_type2', 'side',
+                      'event_team', 'opponent', 'player', 'player2', 'player_in', 'player_out', 'shot_place',
+                      'shot_outcome', 'is_goal', 'location', 'bodypart', 'assist_method', 'situation',
+                      'fast_break']
+MATCH_FILE_COLUMNS = ['id_odsp', 'link_odsp', 'adv_stats', 'date', 'league', 'season', 'country', 'ht', 'at',
+                      'fthg', 'ftag']
+
+
+def read_dictionary(path=DICTIONARY_PATH):
+    """dictionary.txt as {field: {code: label}}"""
+    fields = {}
+    field = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                field = None
+            elif field is None:
+                field = line
+                fields[field] = {}
+            else:
+                code, label = line.split('\t', 1)
+                fields[field][int(code)] = label
+    return fields
+
+
+def check_codes(dictionary=None):
+    """Raise ValueError if a weight table uses a code that dictionary.txt does not define"""
+    dictionary = dictionary or read_dictionary()
+    tables = {'event_type': EVENT_TYPE_WEIGHTS, 'shot_outcome': SHOT_OUTCOME_WEIGHTS,
+              'location': LOCATION_WEIGHTS, 'bodypart': BODYPART_WEIGHTS,
+              'assist_method': ASSIST_METHOD_WEIGHTS, 'situation': SITUATION_WEIGHTS}
+    tables.update({f'shot_place (outcome {outcome})': weights for outcome, weights in SHOT_PLACE_WEIGHTS.items()})
+    for name, weights in tables.items():
+        unknown = set(weights) - set(dictionary[name.split(' ')[0]])
+        if unknown:
+            raise ValueError(f"{name} weights use codes missing from dictionary.txt: {sorted(unknown)}")
+
+
+def _draw(rng, weights, size):
+    codes = np.array(list(weights))
+    probabilities = np.array(list(weights.values()), dtype=np.float64)
+    return rng.choice(codes, size=size, p=probabilities / probabilities.sum())
+
+
+def player_names(count, seed=0):
+    """count distinct lowercase player names (accented ones included), numbered once combinations run out"""
+    rng = np.random.default_rng(seed)
+    combinations = [f'{first} {last}' for first in FIRST_NAMES for last in LAST_NAMES]
+    names = []
+    for round_number in range(count // len(combinations) + 1):
+        suffix = f' {round_number + 1}' if round_number else ''
+        names += [name + suffix for name in rng.permutation(combinations)]
+    return names[:count]
+
+
+def plan_matches(events, seed=0):
+    """
+    The match list (ginf.csv rows) for about `events` events: enough leagues
+    for the matches to fit into MAX_SEASONS seasons each, teams playing within
+    their league, about 10 matches per league each week
+    """
+    rng = np.random.default_rng(seed)
+    matches = max(1, round(events / EVENTS_PER_MATCH))
+    leagues = max(len(LEAGUES), -(-matches // (MATCHES_PER_SEASON * MAX_SEASONS)))
+    league_names = [LEAGUES[i % len(LEAGUES)] + (f'_{i // len(LEAGUES) + 1}' if i >= len(LEAGUES) else '')
+                    for i in range(leagues)]
+
+    league = np.arange(matches) % leagues
+    number = np.arange(matches) // leagues  # match number within the league
+    home = rng.integers(0, TEAMS_PER_LEAGUE, matches)
+    away = (home + rng.integers(1, TEAMS_PER_LEAGUE, matches)) % TEAMS_PER_LEAGUE
+    season = number // MATCHES_PER_SEASON
+    # About 10 matches per league per weekend, seasons starting in August
+    days = season * 365 + (number % MATCHES_PER_SEASON) // 10 * 7 + rng.integers(0, 3, matches)
+    alphabet = np.array(list('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'))
+    ids = [''.join(chars) + '/' for chars in alphabet[rng.integers(0, len(alphabet), (matches, 8))]]
+    team_base = league * TEAMS_PER_LEAGUE
+
+    return pd.DataFrame({
+        'id_odsp': ids,
+        'link_odsp': [f'/soccer/match/{match_id}' for match_id in ids],
+        'adv_stats': True,
+        'date': (pd.Timestamp(f'{FIRST_SEASON}-08-10') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d'),
+        'league': np.array(league_names)[league],
+        'season': FIRST_SEASON + 1 + season,
+        'country': [COUNTRIES[name.split('_')[0]] for name in np.array(league_names)[league]],
+        'home_team': team_base + home,
+        'away_team': team_base + away,
+        'fthg': rng.poisson(1.5, matches),
+        'ftag': rng.poisson(1.1, matches)
+    })
+
+
+def generate_events(matches, team_names, squads, event_labels, seed=0):
+    """Events of the given matches (a plan_matches slice), in match and then sort order"""
+    rng = np.random.default_rng(seed)
+    counts = np.maximum(20, rng.poisson(EVENTS_PER_MATCH, len(matches)))
+    total = counts.sum()
+    match = np.repeat(np.arange(len(matches)), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    sort_order = np.arange(total) - starts + 1
+    # Minutes rise through the match (added time included)
+    time_played = np.minimum(95, 1 + (sort_order - 1) * 94 // np.repeat(counts, counts) + rng.integers(0, 2, total))
+
+    side = rng.integers(1, 3, total)
+    home, away = matches['home_team'].to_numpy()[match], matches['away_team'].to_numpy()[match]
+    team = np.where(side == 1, home, away)
+    opponent = np.where(side == 1, away, home)
+    event_type = _draw(rng, EVENT_TYPE_WEIGHTS, total)
+    shot = event_type == 1
+    player = squads[team, rng.integers(0, SQUAD_SIZE, total)].astype(object)
+    player[rng.random(total) < MISSING_PLAYER_RATE] = None
+
+    def shot_column(values, name):
+        column = np.full(total, np.nan)
+        column[shot] = values
+        column[shot & (rng.random(total) < SHOT_MISSING_RATES.get(name, 0))] = np.nan
+        return column
+
+    shots = shot.sum()
+    outcome = _draw(rng, SHOT_OUTCOME_WEIGHTS, shots)
+    place = np.empty(shots, dtype=np.int64)
+    for code, weights in SHOT_PLACE_WEIGHTS.items():
+        place[outcome == code] = _draw(rng, weights, (outcome == code).sum())
+    is_goal = np.zeros(total, dtype=np.int64)
+    is_goal[shot] = (outcome == 1) & (rng.random(shots) < ON_TARGET_GOAL_RATE)
+    assist_method = np.zeros(total, dtype=np.int64)
+    assist_method[shot] = _draw(rng, ASSIST_METHOD_WEIGHTS, shots)
+
+    team_name, opponent_name = team_names[team], team_names[opponent]
+    labels = pd.Series(event_labels).reindex(event_type).to_numpy()
+    text = pd.Series(labels, dtype=object) + ', ' + pd.Series(player).fillna('unknown') + ' (' + team_name + ')'
+
+    match_ids = matches['id_odsp'].to_numpy()[match]
+    return pd.DataFrame({
+        'id_odsp': match_ids,
+        'id_event': [f'{match_id[:-1]}{order}' for match_id, order in zip(match_ids, sort_order)],
+        'sort_order': sort_order,
+        'time': time_played,
+        'text': text.to_numpy(),
+        'event_type': event_type,
+        'event_type2': np.where(rng.random(total) < 0.08, 12.0, np.nan),
+        'side': side,
+        'event_team': team_name,
+        'opponent': opponent_name,
+        'player': player,
+        'player2': None,
+        'player_in': None,
+        'player_out': None,
+        'shot_place': shot_column(place, 'shot_place'),
+        'shot_outcome': shot_column(outcome, 'shot_outcome'),
+        'is_goal': is_goal,
+        'location': shot_column(_draw(rng, LOCATION_WEIGHTS, shots), 'location'),
+        'bodypart': shot_column(_draw(rng, BODYPART_WEIGHTS, shots), 'bodypart'),
+        'assist_method': assist_method,
+        'situation': shot_column(_draw(rng, SITUATION_WEIGHTS, shots), 'situation'),
+        'fast_break': (rng.random(total) < 0.03).astype(np.int64)
+    }, columns=EVENT_FILE_COLUMNS)
+
+
+def write_dataset(events_path, matches_path, events, seed=0):
+    """
+    Write an events.csv / ginf.csv pair with about `events` events. Matches are
+    generated and appended in chunks, so memory stays bounded at any size.
+    Returns the number of events and matches written.
+    """
+    dictionary = read_dictionary()
+    check_codes(dictionary)
+    matches = plan_matches(events, seed)
+    teams = matches['league'].nunique() * TEAMS_PER_LEAGUE
+    team_names = np.array([f"{league.lower()} club {number + 1}" for league in pd.unique(matches['league'])
+                           for number in range(TEAMS_PER_LEAGUE)])
+    squads = np.array(player_names(teams * SQUAD_SIZE, seed), dtype=object).reshape(teams, SQUAD_SIZE)
+
+    ginf = matches.assign(ht=team_names[matches['home_team']], at=team_names[matches['away_team']])
+    ginf[MATCH_FILE_COLUMNS].to_csv(matches_path, index=False)
+
+    written = 0
+    for chunk, start in enumerate(range(0, len(matches), MATCHES_PER_CHUNK)):
+        chunk_events = generate_events(matches.iloc[start:start + MATCHES_PER_CHUNK], team_names, squads,
+                                       dictionary['event_type'], seed=(seed, chunk))
+        chunk_events.to_csv(events_path, index=False, mode='w' if chunk == 0 else 'a', header=chunk == 0)
+        written += len(chunk_events)
+    return written, len(matches)
+
+
+def dataset_paths(directory, scale=None, events=None):
+    """The CSV pair for a scale (events-10x.csv) or an exact number of events (events-300000.csv)"""
+    label = f'{scale:g}x' if events is None else f'{events}'
+    return os.path.join(directory, f'events-{label}.csv'), os.path.join(directory, f'ginf-{label}.csv')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic events.csv / ginf.csv pair')
+    parser.add_argument('--scale', type=float, default=1,
+                        help=f'size in multiples of the Kaggle events.csv ({EVENTS_PER_SCALE:,} events; '
+                             f'e.g. 0.1, 1, 10)')
+    parser.add_argument('--events', type=int, help='exact number of events (overrides --scale)')
+    parser.add_argument('--output-dir', default='synthetic_data', help='directory to write the CSVs to')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (same seed, same files)')
+    args = parser.parse_args()
+
+    events = args.events or round(args.scale * EVENTS_PER_SCALE)
+    os.makedirs(args.output_dir, exist_ok=True)
+    events_path, matches_path = dataset_paths(args.output_dir, args.scale, args.events)
+
+    start = time.perf_counter()
+    written, matches = write_dataset(events_path, matches_path, events, args.seed)
+    print(f"Wrote {written:,} events of {matches:,} matches to '{events_path}' and '{matches_path}' "
+          f"in {time.perf_counter() - start:.1f} s")
+    print(f"Use them with: export EVENTS_CSV={events_path} GINF_CSV={matches_path}")
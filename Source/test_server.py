@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from data_loader import EVENT_COLUMNS, EVENT_DTYPES, load_matches
+from server import QueryIndex
+from synthetic_data import write_dataset
+
+
+@pytest.fixture(scope='module')
+def dataset(tmp_path_factory):
+    """A small synthetic season, split into the matches served first and one later match"""
+    directory = tmp_path_factory.mktemp('synthetic')
+    events_path, matches_path = directory / 'events.csv', directory / 'ginf.csv'
+    write_dataset(events_path, matches_path, 20_000)
+    events = pd.read_csv(events_path, usecols=EVENT_COLUMNS, dtype=EVENT_DTYPES)[EVENT_COLUMNS]
+    matches = load_matches(matches_path)
+
+    last_match = events['id_odsp'].iloc[-1]
+    later = events['id_odsp'] == last_match
+    return events[~later], events[later], matches
+
+
+def shooter_in(index, events):
+    """A rated player with a shot in `events`"""
+    shooters = set(events.loc[events['event_type'] == 1, 'player'].dropna().astype(str))
+    return next(player['Player'] for player in index.tables.players if player['Player'] in shooters)
+
+
+def test_profile_from_tables_before_ingest_is_not_cached(dataset):
+    first, later, matches = dataset
+    index = QueryIndex(first, matches)
+    player = shooter_in(index, later)
+    before = index.profile(player)['history']['total']
+
+    # Ingest after the request took its tables snapshot, before the cache lookup
+    lookup = index.profiles.get
+
+    def get_after_ingest(*args):
+        index.ingest(later)
+        return lookup(*args)
+
+    index.profiles.get = get_after_ingest
+    assert index.profile(player)['history']['total'] == before
+    index.profiles.get = lookup
+
+    # The profile built from the old tables was not kept under the new data
+    after = index.profile(player)['history']['total']
+    assert after > before
+    assert after == index.tables.profile(index.tables.find_player(player))['history']['total']
+
+
+def test_unaffected_profiles_stay_cached_across_ingest(dataset):
+    first, later, matches = dataset
+    index = QueryIndex(first, matches)
+    shooters = set(later.loc[later['event_type'] == 1, 'player'].dropna().astype(str))
+    player = next(player['Player'] for player in index.tables.players if player['Player'] not in shooters)
+    index.profile(player)
+    index.ingest(later)
+    hits = index.profiles.hits
+    index.profile(player)
+    assert index.profiles.hits == hits + 1
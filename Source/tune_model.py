@@ -0,0 +1,158 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from data_loader import load_events
+from model import RF_PARAMS, collapse_duplicates, feature_matrix, train_shooting_model
+from scoring import score_shot_attempts
+
+# Settings tried by default (every combination); random_state stays RF_PARAMS'
+PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [6, 10, 14, None],
+    'min_samples_leaf': [1, 5]
+}
+DEFAULT_FOLDS = 5
+DEFAULT_RESULTS_PATH = 'tuning_results.json'
+
+
+def param_configs(grid):
+    """Every combination of the grid's values, as RandomForestRegressor keyword arguments"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def cv_folds(shot_data, folds, grouped=True, seed=0):
+    """
+    (train, test) row indices for each fold. Grouped folds keep every shot of
+    a match (id_odsp) on the same side, so no match is both trained and scored.
+    """
+    from sklearn.model_selection import GroupKFold, KFold
+
+    if grouped:
+        groups = shot_data['id_odsp'].cat.codes.to_numpy()
+        return list(GroupKFold(n_splits=folds).split(np.zeros(len(groups)), groups=groups))
+    return list(KFold(n_splits=folds, shuffle=True, random_state=seed).split(np.zeros(len(shot_data))))
+
+
+def fold_data(X, y, train, test, collapse=True):
+    """One fold's training and test rows, each as (X, y, weights); collapsed to distinct tuples by default"""
+    if not collapse:
+        return (X[train], y[train], None), (X[test], y[test], None)
+    return collapse_duplicates(X[train], y[train]), collapse_duplicates(X[test], y[test])
+
+
+def evaluate_config(params, train, test):
+    """
+    Fit one config on one fold (single-threaded, the folds and configs run in
+    parallel instead) and score it. Weighted metrics over collapsed test rows
+    equal the plain metrics over every shot.
+    """
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    X_train, y_train, w_train = train
+    X_test, y_test, w_test = test
+    if w_train is not None and params.get('min_samples_leaf', 1) > 1:
+        # A collapsed row stands for many shots: require the leaf's shots (its
+        # weight), not its distinct tuples, to reach min_samples_leaf
+        params = {**params, 'min_samples_leaf': 1,
+                  'min_weight_fraction_leaf': params['min_samples_leaf'] / w_train.sum()}
+    start = time.perf_counter()
+    rf_model = train_shooting_model(X_train, y_train, n_jobs=1, sample_weight=w_train, **params)
+    fit_seconds = time.perf_counter() - start
+    y_pred = rf_model.predict(X_test)
+    return {
+        'r2': r2_score(y_test, y_pred, sample_weight=w_test),
+        'rmse': float(np.sqrt(mean_squared_error(y_test, y_pred, sample_weight=w_test))),
+        'fit_seconds': fit_seconds,
+        'train_rows': len(X_train)
+    }
+
+
+def run_search(configs, folds, workers=None):
+    """Evaluate every (config, fold) pair on a process pool; returns one summary per config"""
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+        futures = {pool.submit(evaluate_config, params, train, test): (index, fold)
+                   for index, params in enumerate(configs) for fold, (train, test) in enumerate(folds)}
+        for future, (index, fold) in futures.items():
+            results.setdefault(index, []).append(future.result())
+
+    summaries = []
+    for index, params in enumerate(configs):
+        scores = results[index]
+        r2 = np.array([score['r2'] for score in scores])
+        rmse = np.array([score['rmse'] for score in scores])
+        summaries.append({
+            'params': params,
+            'r2_mean': round(float(r2.mean()), 4), 'r2_std': round(float(r2.std()), 4),
+            'rmse_mean': round(float(rmse.mean()), 4), 'rmse_std': round(float(rmse.std()), 4),
+            'fit_seconds': round(sum(score['fit_seconds'] for score in scores), 3),
+            'train_rows': int(np.mean([score['train_rows'] for score in scores]))
+        })
+    return sorted(summaries, key=lambda summary: summary['rmse_mean'])
+
+
+def _values(text):
+    """'10' -> 10, 'none' -> None (for max_depth)"""
+    return None if text.lower() == 'none' else int(text)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cross-validated hyperparameter search for the shot model')
+    parser.add_argument('--events', help='path to events.csv (default: $EVENTS_CSV)')
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS, help='number of CV folds')
+    parser.add_argument('--cv', choices=['match', 'kfold'], default='match',
+                        help="'match' keeps each match's shots in one fold (GroupKFold on id_odsp); "
+                             "'kfold' splits shots at random")
+    parser.add_argument('--n-estimators', type=int, nargs='+', default=PARAM_GRID['n_estimators'])
+    parser.add_argument('--max-depth', type=_values, nargs='+', default=PARAM_GRID['max_depth'],
+                        help="tree depths to try ('none' for unlimited)")
+    parser.add_argument('--min-samples-leaf', type=int, nargs='+', default=PARAM_GRID['min_samples_leaf'])
+    parser.add_argument('--no-collapse', action='store_true',
+                        help='fit on every shot instead of weighted distinct feature tuples')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--output', default=DEFAULT_RESULTS_PATH, help='where to write the results JSON')
+    args = parser.parse_args()
+
+    shot_data = score_shot_attempts(load_events(args.events))
+    X = feature_matrix(shot_data)
+    y = shot_data['shooting_ability_score'].to_numpy(dtype=np.float64)
+
+    start = time.perf_counter()
+    folds = [fold_data(X, y, train, test, collapse=not args.no_collapse)
+             for train, test in cv_folds(shot_data, args.folds, grouped=args.cv == 'match')]
+    prepare_seconds = time.perf_counter() - start
+    configs = param_configs({'n_estimators': args.n_estimators, 'max_depth': args.max_depth,
+                             'min_samples_leaf': args.min_samples_leaf})
+    print(f"{len(X)} shots, {args.folds} {args.cv} folds of ~{int(np.mean([len(f[0][0]) for f in folds]))} "
+          f"training rows (prepared in {prepare_seconds:.2f} s), {len(configs)} configs, "
+          f"{args.workers or os.cpu_count()} workers")
+
+    start = time.perf_counter()
+    summaries = run_search(configs, folds, args.workers)
+    elapsed = time.perf_counter() - start
+
+    # The settings train_model.py uses (min_samples_leaf is sklearn's default)
+    current = {'n_estimators': RF_PARAMS['n_estimators'], 'max_depth': RF_PARAMS['max_depth'], 'min_samples_leaf': 1}
+    print(f"\n{'n_estimators':>12} {'max_depth':>9} {'min_leaf':>8} {'R²':>15} {'RMSE':>15} {'fit s':>8}")
+    for summary in summaries:
+        params = summary['params']
+        marker = '  ← RF_PARAMS' if params == current else ''
+        print(f"{params['n_estimators']:>12} {str(params['max_depth']):>9} {params['min_samples_leaf']:>8} "
+              f"{summary['r2_mean']:8.4f} ±{summary['r2_std']:.4f} {summary['rmse_mean']:8.3f} "
+              f"±{summary['rmse_std']:.3f} {summary['fit_seconds']:8.2f}" + marker)
+    print(f"\n{len(configs) * args.folds} fits in {elapsed:.1f} s wall")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'events': args.events, 'folds': args.folds, 'cv': args.cv, 'collapsed': not args.no_collapse,
+                   'shots': len(X), 'seconds': round(elapsed, 2), 'results': summaries}, f, indent=2)
+    best = summaries[0]
+    print(f"✅ Best: {best['params']} (RMSE {best['rmse_mean']:.3f}, R² {best['r2_mean']:.4f}); "
+          f"results saved to '{args.output}'")
@@ -0,0 +1,262 @@
+import base64
+import json
+import unicodedata
+import zlib
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from form import FORM_COLUMNS, FORM_DECIMALS, add_form
+
+# Letters NFKD does not decompose into a base letter plus accents (kept in sync with SEARCH_JS)
+FOLD_EXTRA = {'ß': 'ss', 'æ': 'ae', 'œ': 'oe', 'ø': 'o', 'ł': 'l', 'đ': 'd', 'ð': 'd', 'þ': 'th', 'ı': 'i'}
+_FOLD_TABLE = str.maketrans(FOLD_EXTRA)
+
+# Name n-grams indexed for search: bigrams answer two-letter queries exactly,
+# trigrams narrow longer queries down to a few candidates
+SEARCH_GRAM_SIZES = (2, 3)
+
+# Numeric shot columns shipped to the page: block column name -> shot_data column
+SHOT_NUMERIC_COLUMNS = {
+    'date': 'date_ordinal',
+    'time': 'time',
+    'is_goal': 'is_goal',
+    'score': 'shooting_ability_score',
+    **{column: column for column in FORM_COLUMNS}
+}
+
+# Decimals kept for non-integral columns (default: stored as float32)
+SHOT_COLUMN_DECIMALS = {column: FORM_DECIMALS for column in FORM_COLUMNS}
+
+
+def compact_json(data):
+    """JSON without indentation or spaces after separators"""
+    return json.dumps(data, separators=(',', ':'))
+
+
+def shard_of(player_name, shards):
+    """Stable shard number for a player (CRC-32 of the name)"""
+    return zlib.crc32(player_name.encode('utf-8')) % shards
+
+
+def page_shots(shot_data, players):
+    """
+    The shots shipped to the page: those of `players` (only rated players can be
+    opened), in career order, with their form precomputed by form.add_form.
+    Without the match dates from add_match_info, shots stay in data order and
+    match form is left out.
+    """
+    shots = add_form(shot_data[shot_data['player'].isin(set(players))])
+    if 'date_ordinal' not in shots:
+        shots = shots.drop(columns=['match_form'])
+    return shots
+
+
+def pack_column(values, decimals=None):
+    """
+    Pack a numeric column as a little-endian typed array, base64-encoded.
+    Whole numbers use the smallest unsigned type that fits (Uint8Array for
+    codes, minutes and scores); missing values become the type's maximum,
+    recorded as 'missing'. Anything else is stored as Float32Array, unless
+    `decimals` is given: then values are rounded to that many decimals and
+    stored as whole multiples of 'scale' (the page divides them back).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = None
+    if decimals is not None:
+        scale = 10 ** decimals
+        values = np.round(values * scale)
+    missing = np.isnan(values)
+    present = values[~missing]
+
+    if len(present) and ((present != np.floor(present)) | (present < 0)).any():
+        packed = {'type': 'float32'}
+        data = values.astype('<f4')
+    else:
+        top = int(present.max()) if len(present) else 0
+        dtype = np.min_scalar_type(top + 1 if missing.any() else top)
+        dtype = np.dtype(dtype).newbyteorder('<') if dtype.itemsize > 1 else np.dtype(dtype)
+        packed = {'type': f'uint{dtype.itemsize * 8}'}
+        if missing.any():
+            packed['missing'] = int(np.iinfo(dtype).max)
+            values = np.where(missing, packed['missing'], values)
+        data = values.astype(dtype)
+
+    if scale is not None:
+        packed['scale'] = scale
+    packed['data'] = base64.b64encode(data.tobytes()).decode('ascii')
+    return packed
+
+
+def encode_shot_block(shots, players):
+    """
+    Columnar encoding of scored shots for the page: one typed array per field,
+    with team names replaced by indexes into a string table.
+
+    Shots are grouped by player in the order of `players` (keeping their data
+    order within a player), so player i's shots are rows offsets[i] to
+    offsets[i + 1]. Shots of players not in `players` are left out, and so are
+    columns the shots do not have (dates and match form without ginf.csv).
+    """
+    player_ids = pd.Index(players).get_indexer(shots['player'].astype(object))
+    order = np.argsort(player_ids, kind='stable')
+    order = order[player_ids[order] >= 0]
+    shots = shots.iloc[order]
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(player_ids[order], minlength=len(players)))])
+
+    opponent_codes, team_names = pd.factorize(shots['opponent'].astype(object).fillna(''))
+    columns = {'opponent': pack_column(opponent_codes)}
+    for name, source in SHOT_NUMERIC_COLUMNS.items():
+        if source not in shots:
+            continue
+        columns[name] = pack_column(shots[source].to_numpy(dtype=np.float64, na_value=np.nan),
+                                    SHOT_COLUMN_DECIMALS.get(name))
+
+    return {
+        'length': len(shots),
+        'strings': {'player': list(players), 'team': list(team_names)},
+        'offsets': pack_column(offsets),
+        'columns': columns
+    }
+
+
+def lowercase_name_index(names):
+    """
+    Lowercase name -> position in `names`, for case-insensitive lookups in O(1).
+    The first of several names differing only in case wins, as a linear
+    search would.
+    """
+    index = {}
+    for position, name in enumerate(names):
+        index.setdefault(name.lower(), position)
+    return index
+
+
+def fold_name(name):
+    """Lowercase, accent-free form of a name, as compared by the page's search"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(char for char in decomposed if not unicodedata.category(char).startswith('M'))
+    return stripped.lower().translate(_FOLD_TABLE)
+
+
+def build_search_index(names):
+    """
+    Search index over `names` for the page's autocomplete: the folded names plus,
+    for every bigram and trigram, the ascending positions of the names that
+    contain it (packed like shot columns).
+    """
+    folded = [fold_name(name) for name in names]
+    postings = defaultdict(list)
+    for position, name in enumerate(folded):
+        grams = {name[i:i + size] for size in SEARCH_GRAM_SIZES for i in range(len(name) - size + 1)}
+        for gram in grams:
+            postings[gram].append(position)
+
+    return {
+        'names': folded,
+        'grams': {gram: pack_column(positions) for gram, positions in postings.items()}
+    }
+
+
+# Page-side decoder for encode_shot_block: typed-array views over the decoded
+# bytes, so no object is created per shot
+DECODE_BLOCK_JS = '''function decodeColumn(column) {
+            const arrayTypes = {uint8: Uint8Array, uint16: Uint16Array, uint32: Uint32Array, float32: Float32Array};
+            const binary = atob(column.data);
+            const bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+            const values = new arrayTypes[column.type](bytes.buffer);
+            if (!column.scale) return values;
+            const scaled = new Float64Array(values.length);
+            for (let i = 0; i < values.length; i++) scaled[i] = values[i] / column.scale;
+            return scaled;
+        }
+
+        function decodeShotBlock(block) {
+            const columns = {};
+            for (const name in block.columns) columns[name] = decodeColumn(block.columns[name]);
+            const missing = {};
+            for (const name in block.columns) {
+                const column = block.columns[name];
+                missing[name] = column.missing === undefined ? undefined : column.missing / (column.scale || 1);
+            }
+            return {length: block.length, strings: block.strings, offsets: decodeColumn(block.offsets),
+                    columns: columns, missing: missing};
+        }
+
+        // A player's shots: a contiguous run of rows in a decoded shot block
+        function playerShotRange(block, slot) {
+            const start = block.offsets[slot];
+            return {block: block, start: start, length: block.offsets[slot + 1] - start};
+        }'''
+
+
+# Page-side search over build_search_index (needs decodeColumn from DECODE_BLOCK_JS)
+SEARCH_JS = r'''const foldExtra = {'ß': 'ss', 'æ': 'ae', 'œ': 'oe', 'ø': 'o', 'ł': 'l', 'đ': 'd', 'ð': 'd', 'þ': 'th', 'ı': 'i'};
+
+        function foldName(text) {
+            return text.normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase()
+                .replace(/[ßæœøłđðþı]/g, char => foldExtra[char]);
+        }
+
+        // Returns search(query, limit): positions of the names containing the folded query,
+        // in name order. With no such name, falls back to the names sharing the most
+        // trigrams with the query (at least a third of them), so small typos still match.
+        function createPlayerSearch(index) {
+            const empty = new Uint8Array(0);
+            const postingCache = new Map();
+
+            function postings(gram) {
+                if (!postingCache.has(gram)) {
+                    const found = Object.prototype.hasOwnProperty.call(index.grams, gram);
+                    postingCache.set(gram, found ? decodeColumn(index.grams[gram]) : empty);
+                }
+                return postingCache.get(gram);
+            }
+
+            function queryGrams(chars, size) {
+                const grams = new Set();
+                for (let i = 0; i + size <= chars.length; i++) grams.add(chars.slice(i, i + size).join(''));
+                return Array.from(grams, postings);
+            }
+
+            function fuzzy(chars, limit) {
+                const lists = queryGrams(chars, 3);
+                const needed = Math.ceil(lists.length / 3);
+                const shared = new Map();
+                for (const list of lists) {
+                    for (const position of list) shared.set(position, (shared.get(position) || 0) + 1);
+                }
+                return Array.from(shared.keys())
+                    .filter(position => shared.get(position) >= needed)
+                    .sort((a, b) => shared.get(b) - shared.get(a) || a - b)
+                    .slice(0, limit);
+            }
+
+            return function search(query, limit) {
+                const text = foldName(query.trim());
+                const chars = Array.from(text);
+                if (chars.length < 2) return [];
+
+                // Walk the shortest posting list; a candidate must be in every other list
+                // (merged with moving pointers) and, for long queries, contain the whole text
+                const size = Math.min(chars.length, 3);
+                const lists = queryGrams(chars, size).sort((a, b) => a.length - b.length);
+                const pointers = new Array(lists.length).fill(0);
+                const matches = [];
+                for (const position of lists[0]) {
+                    let inAll = true;
+                    for (let k = 1; k < lists.length && inAll; k++) {
+                        const list = lists[k];
+                        while (pointers[k] < list.length && list[pointers[k]] < position) pointers[k]++;
+                        inAll = pointers[k] < list.length && list[pointers[k]] === position;
+                    }
+                    if (inAll && (chars.length === size || index.names[position].includes(text))) {
+                        matches.push(position);
+                        if (matches.length === limit) break;
+                    }
+                }
+                return matches.length || chars.length < 3 ? matches : fuzzy(chars, limit);
+            };
+        }'''